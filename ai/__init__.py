@@ -1,7 +1,10 @@
 # ai/__init__.py
 
-from .behavior import decide_action
+from .behavior import decide_action, decide_actions
+from .pathfinding import FlowField
 
 __all__ = [
-    "decide_action"
+    "decide_action",
+    "decide_actions",
+    "FlowField"
 ]
@@ -1,5 +1,15 @@
 # ai/behavior.py
 
+import numpy as np
+
+# Distances d'engagement (en unités monde)
+ATTACK_RANGE = 1.5
+CHASE_RANGE = 6.0
+
+# Actions possibles, et leur index dans la version vectorisée (decide_actions)
+ACTIONS = ("idle", "patrol", "chase", "attack")
+IDLE, PATROL, CHASE, ATTACK = range(len(ACTIONS))
+
 def decide_action(enemy, player):
     """
     Détermine l'action actuelle d'un ennemi selon son état et l'environnement.
@@ -11,15 +21,27 @@ def decide_action(enemy, player):
     distance = _distance(enemy.position, player.position)
 
     # Logique d'engagement
-    if distance < 1.5:
+    if distance < ATTACK_RANGE:
         return "attack"
-    elif distance < 6.0:
+    elif distance < CHASE_RANGE:
         return "chase"
     elif enemy.state in ("idle", "patrol"):
         return "patrol"
     else:
         return "idle"
 
+def decide_actions(health, distances, idle_or_patrol):
+    """
+    Version vectorisée de decide_action pour tout un groupe d'ennemis.
+    `health`, `distances` (au joueur) et `idle_or_patrol` (état actuel idle/patrol)
+    sont des tableaux NumPy ; retourne les actions sous forme d'index dans ACTIONS.
+    """
+    return np.select(
+        [health <= 0, distances < ATTACK_RANGE, distances < CHASE_RANGE, idle_or_patrol],
+        [IDLE, ATTACK, CHASE, PATROL],
+        default=IDLE
+    ).astype(np.int8)
+
 def _distance(pos1, pos2):
     dx = pos1[0] - pos2[0]
     dz = pos1[2] - pos2[2]
@@ -0,0 +1,212 @@
+# ai/foe_batch.py
+
+import numpy as np
+from .behavior import ACTIONS, IDLE, PATROL, CHASE, ATTACK, decide_actions
+
+# Marge de collision avec les murs (identique à Foe._move_toward)
+COLLISION_OFFSET = 0.2
+
+# Attributs d'un Foe stockés dans les tableaux du lot une fois rattaché
+BATCH_FIELDS = ("position", "health", "state", "dmg_timer", "attack_timer")
+
+
+class BatchField:
+    """
+    Attribut "vue" d'un ennemi : tant que l'objet n'est rattaché à aucun FoeBatch,
+    la valeur vit dans l'objet ; ensuite, lecture et écriture passent directement
+    par la ligne `_slot` des tableaux NumPy du lot.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.storage = "_" + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        if obj._batch is None:
+            return obj.__dict__[self.storage]
+        return obj._batch.get(self.name, obj._slot)
+
+    def __set__(self, obj, value):
+        if obj._batch is None:
+            obj.__dict__[self.storage] = value
+        else:
+            obj._batch.set(self.name, obj._slot, value)
+
+
+class FoeBatch:
+    """
+    IA groupée des ennemis (structure de tableaux) : positions, PV, minuteries,
+    états et caractéristiques de tous les ennemis d'un niveau sont des tableaux NumPy.
+    `update` calcule en une fois distances, choix d'action, recharges et déplacements
+    avec collision par axe ; seuls les événements rares (changement de sprite,
+    attaque portée) repassent par les objets, un par un.
+    Les objets Foe restent la référence pour le rendu et la persistance : leurs
+    attributs BATCH_FIELDS ne sont plus que des vues sur ces tableaux.
+    Même comportement, image par image, que Foe.update appelé sur chaque ennemi.
+    """
+    def __init__(self, foes):
+        self.foes = list(foes)
+        count = len(self.foes)
+        self.state_names = list(ACTIONS)  # Les codes des actions sont ceux de decide_actions
+        self._state_codes = {name: code for code, name in enumerate(self.state_names)}
+
+        self.position = np.array([list(foe.position) for foe in self.foes], dtype=np.float64).reshape(count, 3)
+        self.health = np.array([foe.health for foe in self.foes], dtype=np.float64)
+        self.state = np.array([self._state_code(foe.state) for foe in self.foes], dtype=np.int16)
+        self.dmg_timer = np.array([foe.dmg_timer for foe in self.foes], dtype=np.float64)
+        self.attack_timer = np.array([foe.attack_timer for foe in self.foes], dtype=np.float64)
+        self.power = np.array([foe.P for foe in self.foes], dtype=np.float64)
+        self.speed = np.array([foe.speed for foe in self.foes], dtype=np.float64)
+        self.patrol_count = np.array([len(foe.patrol_points) for foe in self.foes], dtype=np.int32)
+        self.has_patrol = self.patrol_count > 0
+        self.patrol_target = np.array([self._patrol_target(foe) for foe in self.foes], dtype=np.float64).reshape(count, 2)
+
+        # Les valeurs vivent désormais dans les tableaux : les objets deviennent des vues
+        for slot, foe in enumerate(self.foes):
+            for name in BATCH_FIELDS:
+                foe.__dict__.pop("_" + name, None)
+            foe._batch = self
+            foe._slot = slot
+
+    def _state_code(self, name):
+        code = self._state_codes.get(name)
+        if code is None:
+            code = self._state_codes[name] = len(self.state_names)
+            self.state_names.append(name)
+        return code
+
+    @staticmethod
+    def _patrol_target(foe):
+        """(x, z) du point de patrouille courant."""
+        if not foe.patrol_points:
+            return (0.0, 0.0)
+        target = foe.patrol_points[foe.current_patrol_index]
+        return (target[0], target[2])
+
+    def get(self, name, slot):
+        if name == "position":
+            return self.position[slot]  # Vue modifiable, comme l'ancienne liste
+        if name == "state":
+            return self.state_names[self.state[slot]]
+        return getattr(self, name)[slot].item()
+
+    def set(self, name, slot, value):
+        if name == "position":
+            self.position[slot] = value
+        elif name == "state":
+            self.state[slot] = self._state_code(value)
+        else:
+            getattr(self, name)[slot] = value
+
+    def update(self, player, delta_time, game_map, renderer):
+        if not self.foes:
+            return
+        foes = self.foes
+
+        # 1. Fin de l'effet de blessure (PNJ.update)
+        hurt = self.dmg_timer > 0
+        self.dmg_timer[hurt] -= delta_time
+        for slot in np.flatnonzero(hurt & (self.dmg_timer <= 0) & (self.health > 0)).tolist():
+            foes[slot].set_action("idle")
+
+        # 2. Choix de l'action des ennemis vivants (hors état "dmg")
+        active = (self.health > 0) & (self.state != self._state_code("dmg"))
+        if not active.any():
+            return
+        player_x, player_z = player.position[0], player.position[2]
+        x, z = self.position[:, 0], self.position[:, 2]
+        distances = ((x - player_x) ** 2 + (z - player_z) ** 2) ** 0.5
+        actions = decide_actions(self.health, distances, (self.state == IDLE) | (self.state == PATROL))
+
+        # 3. Déplacements : patrouille vers le point courant, poursuite via le champ de flux
+        target_x = np.full(len(foes), player_x, dtype=np.float64)
+        target_z = np.full(len(foes), player_z, dtype=np.float64)
+
+        patrol = active & (actions == PATROL) & self.has_patrol
+        if patrol.any():
+            target_x[patrol] = self.patrol_target[patrol, 0]
+            target_z[patrol] = self.patrol_target[patrol, 1]
+            arrived = patrol & (((target_x - x) ** 2 + (target_z - z) ** 2) ** 0.5 < 0.1)
+            # Un seul point de patrouille (cas courant : le point d'apparition) : l'index ne change pas
+            for slot in np.flatnonzero(arrived & (self.patrol_count > 1)).tolist():
+                foe = foes[slot]
+                foe.current_patrol_index = (foe.current_patrol_index + 1) % len(foe.patrol_points)
+                self.patrol_target[slot] = self._patrol_target(foe)
+            patrol &= ~arrived
+
+        chase = active & (actions == CHASE)
+        if chase.any():
+            cell_x = np.trunc(x[chase]).astype(np.int64)
+            cell_y = np.trunc(-z[chase]).astype(np.int64)
+            next_x, next_y, valid = game_map.flow_field.next_cells(cell_x, cell_y)
+            target_x[chase] = np.where(valid, next_x + 0.5, player_x)
+            target_z[chase] = np.where(valid, -next_y - 0.5, player_z)
+
+        self._move_toward(np.flatnonzero(patrol | chase), target_x, target_z, delta_time, game_map)
+
+        # 4. Attaques : recharge pour tous, ligne de vue seulement pour ceux qui sont prêts.
+        # (Un ennemi pas prêt repasse "idle" puis aussitôt "attack" à l'étape 5 : inutile de le traiter.)
+        attack = active & (actions == ATTACK)
+        if attack.any():
+            self.attack_timer[attack] += delta_time
+            cooldown = 1.0 - np.clip(self.power, 0, 10) / 10.0
+            ready = np.flatnonzero(attack & (self.attack_timer >= cooldown))
+            if len(ready):
+                # Un ennemi voit le joueur si sa case est dans le champ de vision du joueur
+                # (lecture directe) ; sinon, lignes de vue de tous les prêts en une requête
+                cell_x, cell_y = np.trunc(self.position[ready, 0]), np.trunc(-self.position[ready, 2])
+                player_cell = int(player_x), int(-player_z)
+                if game_map.field_of_view.is_current(*player_cell):
+                    in_sight = game_map.field_of_view.are_visible(cell_x, cell_y)
+                else:
+                    in_sight = game_map.lines_of_sight(cell_x, cell_y, *player_cell)
+                for slot, visible in zip(ready.tolist(), in_sight.tolist()):
+                    foe = foes[slot]
+                    if visible:
+                        foe._attack(player, renderer)
+                        self.attack_timer[slot] = 0.0
+                    elif self.state[slot] == ATTACK:
+                        foe.set_action("idle")
+
+        # 5. État visuel : seuls les ennemis dont l'action change repassent par set_action
+        dead = self._state_code("dead")
+        changed = active & (self.dmg_timer <= 0) & (self.state != dead) & (self.state != actions)
+        for slot in np.flatnonzero(changed).tolist():
+            foes[slot].set_action(ACTIONS[actions[slot]])
+
+    def _move_toward(self, slots, target_x, target_z, delta_time, game_map):
+        """Foe._move_toward pour les ennemis `slots` : pas vers la cible, collision séparée par axe."""
+        if not len(slots):
+            return
+        x = self.position[slots, 0]
+        z = self.position[slots, 2]
+        old_cell_x, old_cell_y = np.floor(x), np.floor(-z)
+        dx = target_x[slots] - x
+        dz = target_z[slots] - z
+        dist = (dx ** 2 + dz ** 2) ** 0.5
+        moving = dist >= 0.01
+        slots, x, z, dx, dz, dist = slots[moving], x[moving], z[moving], dx[moving], dz[moving], dist[moving]
+        old_cell_x, old_cell_y = old_cell_x[moving], old_cell_y[moving]
+
+        dir_x = dx / dist
+        dir_z = dz / dist
+        speed = self.speed[slots]
+        next_x = x + dir_x * speed * delta_time
+        next_z = z + dir_z * speed * delta_time
+
+        cell_x = np.trunc(next_x + np.where(dir_x > 0, COLLISION_OFFSET, -COLLISION_OFFSET)).astype(np.int64)
+        cell_z = np.trunc(-z).astype(np.int64)
+        x = np.where(game_map.are_walkable(cell_x, cell_z), next_x, x)
+
+        cell_x = np.trunc(x).astype(np.int64)
+        cell_z = np.trunc(-next_z + np.where(dir_z < 0, COLLISION_OFFSET, -COLLISION_OFFSET)).astype(np.int64)
+        z = np.where(game_map.are_walkable(cell_x, cell_z), next_z, z)
+
+        self.position[slots, 0] = x
+        self.position[slots, 2] = z
+
+        # Seuls les ennemis qui changent de case sont déplacés dans le hachage spatial
+        crossed = (np.floor(x) != old_cell_x) | (np.floor(-z) != old_cell_y)
+        for slot in slots[crossed].tolist():
+            game_map.pnj_hash.move(self.foes[slot])
@@ -0,0 +1,113 @@
+# ai/pathfinding.py
+
+import numpy as np
+from config import FLOW_FIELD_RADIUS
+
+# Pas candidats (dx, dy) : orthogonaux d'abord (prioritaires à égalité), puis diagonaux
+STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1))
+
+
+class FlowField:
+    """
+    Champ de flux partagé vers une cible (le joueur) : un parcours en largeur depuis
+    la case cible donne à chaque case de sol sa distance en pas, puis la case suivante
+    sur le plus court chemin. Tous les ennemis en poursuite lisent le même champ :
+    le coût ne dépend pas du nombre d'ennemis, et il n'est recalculé que lorsque la
+    cible change de case.
+    Le calcul est limité à une fenêtre de `radius` cases autour de la cible ; au-delà,
+    `next_cell` ne sait pas répondre (None).
+    """
+    def __init__(self, game_map, radius=FLOW_FIELD_RADIUS):
+        self.game_map = game_map
+        self.radius = radius
+        self.target = None
+        self.origin = (0, 0)  # Coin (x, y) de la fenêtre dans la grille
+        self.distance = np.full((0, 0), -1, dtype=np.int32)  # Pas jusqu'à la cible, -1 = inaccessible
+        self.next_step = np.zeros((0, 0, 2), dtype=np.int8)   # (dx, dy) vers la case suivante
+        self.recomputes = 0
+        self._walkable = None  # Masque utilisé au dernier calcul (détecte un rechargement de carte)
+
+    def update(self, target_x, target_y):
+        """Recalcule le champ si la cible a changé de case. Retourne True s'il a été recalculé."""
+        if (target_x, target_y) == self.target and self._walkable is self.game_map.walkable:
+            return False
+        self.target = (target_x, target_y)
+        self._walkable = self.game_map.walkable
+        self._compute()
+        self.recomputes += 1
+        return True
+
+    def _compute(self):
+        walkable = self._walkable
+        height, width = walkable.shape
+        target_x, target_y = self.target
+        x0, y0 = max(target_x - self.radius, 0), max(target_y - self.radius, 0)
+        x1, y1 = min(target_x + self.radius + 1, width), min(target_y + self.radius + 1, height)
+        self.origin = (x0, y0)
+        window = walkable[y0:y1, x0:x1] if x0 < x1 and y0 < y1 else np.zeros((0, 0), dtype=bool)
+        distance = np.full(window.shape, -1, dtype=np.int32)
+        self.distance = distance
+        self.next_step = np.zeros(window.shape + (2,), dtype=np.int8)
+        if not self.game_map.is_walkable(target_x, target_y):
+            return
+
+        # Parcours en largeur vectorisé : le front avance d'une case par itération
+        frontier = np.zeros(window.shape, dtype=bool)
+        frontier[target_y - y0, target_x - x0] = True
+        distance[frontier] = 0
+        steps = 0
+        while steps < self.radius and frontier.any():
+            steps += 1
+            grown = np.zeros_like(frontier)
+            grown[1:] |= frontier[:-1]
+            grown[:-1] |= frontier[1:]
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :-1] |= frontier[:, 1:]
+            frontier = grown & window & (distance < 0)
+            distance[frontier] = steps
+
+        # Case suivante : le voisin le plus proche de la cible. Un pas diagonal n'est
+        # permis que si les deux cases orthogonales sont libres (pas de coin coupé).
+        unreachable = np.int32(self.radius * 2 + 2)
+        padded = np.pad(np.where(distance >= 0, distance, unreachable), 1, constant_values=unreachable)
+        open_cells = np.pad(window, 1, constant_values=False)
+        rows, cols = window.shape
+        candidates = []
+        for dx, dy in STEPS:
+            neighbour = padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols]
+            if dx and dy:
+                corner_free = (open_cells[1:1 + rows, 1 + dx:1 + dx + cols] & open_cells[1 + dy:1 + dy + rows, 1:1 + cols])
+                neighbour = np.where(corner_free, neighbour, unreachable)
+            candidates.append(neighbour)
+        candidates = np.stack(candidates)
+        best = candidates.argmin(axis=0)
+        moves = (distance > 0) & (candidates.min(axis=0) < distance)
+        self.next_step[moves] = np.array(STEPS, dtype=np.int8)[best[moves]]
+
+    def next_cell(self, x, y):
+        """Case suivante (x, y) sur le chemin de la case (x, y) vers la cible, ou None (cible atteinte, trop loin)."""
+        local_x, local_y = x - self.origin[0], y - self.origin[1]
+        rows, cols = self.distance.shape
+        if not (0 <= local_x < cols and 0 <= local_y < rows) or self.distance[local_y, local_x] <= 0:
+            return None
+        dx, dy = self.next_step[local_y, local_x].tolist()
+        if not dx and not dy:
+            return None
+        return x + dx, y + dy
+
+    def next_cells(self, xs, ys):
+        """
+        Version vectorisée de next_cell pour des tableaux de cases.
+        Retourne (x suivants, y suivants, valide) ; hors champ ou cible atteinte, valide est faux.
+        """
+        local_x = xs - self.origin[0]
+        local_y = ys - self.origin[1]
+        rows, cols = self.distance.shape
+        inside = (local_x >= 0) & (local_x < cols) & (local_y >= 0) & (local_y < rows)
+        local_x = np.where(inside, local_x, 0)
+        local_y = np.where(inside, local_y, 0)
+        if not rows or not cols:
+            return xs, ys, np.zeros(len(xs), dtype=bool)
+        steps = self.next_step[local_y, local_x]
+        valid = inside & (self.distance[local_y, local_x] > 0) & steps.any(axis=1)
+        return xs + steps[:, 0], ys + steps[:, 1], valid
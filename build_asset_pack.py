@@ -0,0 +1,14 @@
+# build_asset_pack.py
+
+import time
+from engine.asset_pack import build_asset_pack
+from engine.renderer import TEXTURE_FOLDERS
+from engine.texture_manager import list_texture_files
+from config import ASSET_PACK_PATH
+
+if __name__ == "__main__":
+    # Toutes les images du jeu : l'overworld n'utilise qu'un sous-ensemble de ces dossiers
+    paths = list_texture_files(TEXTURE_FOLDERS)
+    start = time.perf_counter()
+    count = build_asset_pack(paths)
+    print(f"Pack d'assets généré : {ASSET_PACK_PATH} ({count} images, {time.perf_counter() - start:.1f} s)")
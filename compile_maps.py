@@ -0,0 +1,32 @@
+# compile_maps.py
+
+import glob
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from world.map_compiler import compile_map
+
+
+def _compile(path):
+    start = time.perf_counter()
+    output_path = compile_map(path)
+    return output_path, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    # Usage : python compile_maps.py [carte.json ...]  (par défaut : toutes les cartes du jeu)
+    # Chaque carte est compilée dans son propre processus (analyse Python pure, limitée par le GIL)
+    paths = sys.argv[1:] or sorted(glob.glob("assets/maps/*.json"))
+    start = time.perf_counter()
+    compiled = 0
+    with ProcessPoolExecutor() as executor:
+        futures = {path: executor.submit(_compile, path) for path in paths}
+        for path, future in futures.items():
+            try:
+                output_path, duration = future.result()
+            except (OSError, ValueError) as e:
+                print(f"Erreur de compilation : {path} → {e}")
+                continue
+            print(f"{path} → {output_path} ({duration * 1000:.0f} ms)")
+            compiled += 1
+    print(f"{compiled}/{len(paths)} carte(s) compilée(s) en {(time.perf_counter() - start):.1f} s")
@@ -20,6 +20,25 @@ TEXTURES_PATH = ASSETS_PATH + "textures/"
 SPRITES_PATH = ASSETS_PATH + "sprites/"
 SOUNDS_PATH = ASSETS_PATH + "sounds/"
 DEFAULT_MAP = "assets/maps/medium_map.json"
+CACHE_PATH = "cache/"
+ASSET_PACK_PATH = CACHE_PATH + "assets.pack"  # Images pré-décodées (python build_asset_pack.py)
+
+# --- RENDU DU NIVEAU ---
+USE_TEXTURE_ATLAS = False   # Atlas des textures murs/sols : sans shader, seules les faces d'une case y ont accès
+ATLAS_TILE_SIZE = 512       # Taille (px) d'une tuile dans l'atlas
+ATLAS_PADDING = 4           # Bordure répliquée autour de chaque tuile (anti-fuite du filtrage)
+CHUNK_SIZE = 8              # Côté (en cases) d'un chunk pour le culling par frustum
+PVS_MAX_CELLS = 128 * 128   # Au-delà, pas de PVS (mémoire en O(cases²))
+LOS_CACHE_SIZE = 65536      # Couples de cases gardés dans le cache des lignes de vue
+TEXTURE_DECODE_WORKERS = None   # Threads de décodage PNG (None = nombre de cœurs)
+TEXTURE_UPLOAD_QUEUE_SIZE = 32  # Images décodées en attente d'envoi au GPU (borne la mémoire)
+TEXTURE_UPLOAD_BUDGET_MS = 4    # Temps max par frame consacré aux envois de textures en tâche de fond
+TEXTURE_VRAM_BUDGET_MB = 256    # Au-delà, les textures les moins récemment utilisées sont déchargées
+
+# --- INTELLIGENCE ARTIFICIELLE ---
+FLOW_FIELD_RADIUS = 32      # Longueur max (en cases) des chemins du champ de flux vers le joueur
+BATCHED_FOE_AI = True       # IA des ennemis calculée en NumPy pour tous à la fois (ai/foe_batch.py)
+FOV_RADIUS = 24             # Portée (en cases) du champ de vision du joueur (world/fov.py)
 
 # --- CONFIGURATION DES SPRITES ET LOGOS ---
 LOGO_SIZE = 64
@@ -46,5 +65,17 @@ WEAPON_CONFIG = {
         "rpm": 400,
         "mag_size": 12,
         "ammo_type": "9mm"
+    },
+    "shotgun": {
+        "weapon_type": "spread",
+        "power": 10,       # Dégâts par plomb
+        "range": 12.0,
+        "rpm": 70,
+        "mag_size": 6,
+        "ammo_type": "shell",
+        "pellets": 12,
+        "spread": 14.0,    # Ouverture du cône (degrés)
+        "falloff": 0.6,    # Perte de dégâts d'un plomb à portée maximale
+        "sprite": "pistol" # Visuels empruntés au pistolet en attendant des sprites dédiés
     }
 }
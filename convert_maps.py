@@ -0,0 +1,18 @@
+# convert_maps.py
+
+import glob
+import sys
+import time
+from world.map_format import convert_json_map
+
+if __name__ == "__main__":
+    # Usage : python convert_maps.py [carte.json ...]  (par défaut : toutes les cartes du jeu)
+    paths = sys.argv[1:] or sorted(glob.glob("assets/maps/*.json"))
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            output_path = convert_json_map(path)
+        except (OSError, ValueError) as e:
+            print(f"Erreur de conversion : {path} → {e}")
+            continue
+        print(f"{path} → {output_path} ({(time.perf_counter() - start) * 1000:.0f} ms)")
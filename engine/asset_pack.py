@@ -0,0 +1,134 @@
+# engine/asset_pack.py
+
+import json
+import mmap
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from config import ASSETS_PATH, ASSET_PACK_PATH, TEXTURE_DECODE_WORKERS
+
+# Format du pack :
+#   en-tête  "<4sII" : signature, version, taille de l'index JSON
+#   index    JSON : nom relatif -> {offset, width, height, mtime_ns, size}
+#   données  images RGBA brutes (déjà retournées verticalement pour OpenGL),
+#            alignées sur PACK_ALIGNMENT octets ; les offsets de l'index partent
+#            du début de cette zone, elle-même alignée après l'index
+PACK_MAGIC = b"DPAK"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sII")
+PACK_ALIGNMENT = 16
+
+
+def asset_name(path):
+    """Nom relatif d'une image, identique aux clés de Renderer.textures ("textures/mur.png")."""
+    return os.path.relpath(path, ASSETS_PATH).replace("\\", "/")
+
+
+def _align(offset):
+    return (offset + PACK_ALIGNMENT - 1) // PACK_ALIGNMENT * PACK_ALIGNMENT
+
+
+def build_asset_pack(paths, output_path=ASSET_PACK_PATH):
+    """
+    Étape de build : décode toutes les images une fois pour toutes et les écrit
+    en RGBA brut dans un seul fichier, avec un index pour les retrouver.
+    """
+    # Import local : texture_manager dépend d'OpenGL, inutile pour lire un pack
+    from engine.texture_manager import decode_image
+
+    entries = {}
+    data_size = 0
+    for path in paths:
+        with Image.open(path) as image:
+            width, height = image.size
+        stat = os.stat(path)
+        entries[asset_name(path)] = {
+            "offset": data_size, "width": width, "height": height,
+            "mtime_ns": stat.st_mtime_ns, "size": stat.st_size
+        }
+        data_size = _align(data_size + width * height * 4)
+
+    index_data = json.dumps(entries).encode("utf-8")
+    data_start = _align(PACK_HEADER.size + len(index_data))
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f, ThreadPoolExecutor(max_workers=TEXTURE_DECODE_WORKERS) as executor:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index_data)))
+        f.write(index_data)
+        for entry, (image_data, _, _) in zip(entries.values(), executor.map(decode_image, paths)):
+            f.seek(data_start + entry["offset"])
+            f.write(image_data)
+        f.truncate(data_start + data_size)
+    # Remplacement atomique : un jeu en cours ne lit jamais un pack à moitié écrit
+    os.replace(temp_path, output_path)
+    return len(entries)
+
+
+class AssetPack:
+    """
+    Pack d'images RGBA projeté en mémoire (mmap).
+    `lookup` renvoie une vue numpy directement sur le fichier projeté :
+    glTexImage2D lit les pixels sans décodage ni copie intermédiaire.
+    Une entrée dont le fichier source a changé depuis le build est ignorée
+    (le chargeur retombe alors sur le fichier image).
+    """
+    def __init__(self, path=ASSET_PACK_PATH):
+        self.path = path
+        self.entries = {}
+        self._data_start = 0
+        self._file = None
+        self._mmap = None
+
+    def open(self):
+        """Ouvre et projette le pack. Retourne False s'il est absent ou d'une autre version."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            self._file = open(self.path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_size = PACK_HEADER.unpack_from(self._mmap, 0)
+            if magic != PACK_MAGIC or version != PACK_VERSION:
+                print(f"Pack d'assets ignoré (format obsolète) : {self.path}")
+                self.close()
+                return False
+            index_start = PACK_HEADER.size
+            self.entries = json.loads(self._mmap[index_start:index_start + index_size].decode("utf-8"))
+            self._data_start = _align(index_start + index_size)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Pack d'assets illisible : {self.path} → {e}")
+            self.close()
+            return False
+        print(f"Pack d'assets chargé : {self.path} ({len(self.entries)} images)")
+        return True
+
+    def lookup(self, path):
+        """(pixels, largeur, hauteur) pour l'image `path`, ou None si absente ou périmée."""
+        entry = self.entries.get(asset_name(path))
+        if entry is None or self._mmap is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_mtime_ns != entry["mtime_ns"] or stat.st_size != entry["size"]:
+            return None
+
+        width, height = entry["width"], entry["height"]
+        pixels = np.frombuffer(self._mmap, dtype=np.uint8, count=width * height * 4, offset=self._data_start + entry["offset"])
+        return pixels, width, height
+
+    def close(self):
+        # Les vues numpy encore vivantes empêchent de fermer la projection : on la laisse au GC
+        try:
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            pass
+        if self._file is not None:
+            self._file.close()
+        self._mmap = None
+        self._file = None
+        self.entries = {}
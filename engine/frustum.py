@@ -0,0 +1,58 @@
+# engine/frustum.py
+
+import math
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, FOV, NEAR_CLIP, FAR_CLIP
+
+
+class Frustum:
+    """
+    Pyramide de vision de la caméra, calculée en Python à partir de la position
+    et du lacet (rotation_y) du joueur, avec les mêmes paramètres que gluPerspective.
+    Chaque plan est (nx, ny, nz, d) avec la normale vers l'intérieur :
+    un point p est dedans si n·p + d >= 0 pour les six plans.
+    """
+    def __init__(self, fov=FOV, aspect=SCREEN_WIDTH / SCREEN_HEIGHT, near=NEAR_CLIP, far=FAR_CLIP):
+        self.near = near
+        self.far = far
+        half_v = math.radians(fov) / 2
+        half_h = math.atan(math.tan(half_v) * aspect)
+        self._cos_h, self._sin_h = math.cos(half_h), math.sin(half_h)
+        self._cos_v, self._sin_v = math.cos(half_v), math.sin(half_v)
+        self.planes = [(0.0, 0.0, 0.0, 0.0)] * 6
+
+    def update(self, position, rotation_y):
+        """Recalcule les plans pour la caméra courante (même convention que render_player)."""
+        x, y, z = position
+        rad = math.radians(-rotation_y)
+        fx, fz = math.sin(rad), -math.cos(rad)  # Direction de visée (0° = -Z)
+        rx, rz = math.cos(rad), math.sin(rad)   # Vecteur droite
+
+        def through_camera(nx, ny, nz):
+            return (nx, ny, nz, -(nx * x + ny * y + nz * z))
+
+        self.planes = [
+            # Gauche / droite
+            through_camera(rx * self._cos_h + fx * self._sin_h, 0.0, rz * self._cos_h + fz * self._sin_h),
+            through_camera(-rx * self._cos_h + fx * self._sin_h, 0.0, -rz * self._cos_h + fz * self._sin_h),
+            # Bas / haut
+            through_camera(fx * self._sin_v, self._cos_v, fz * self._sin_v),
+            through_camera(fx * self._sin_v, -self._cos_v, fz * self._sin_v),
+            # Proche / lointain
+            (fx, 0.0, fz, -(fx * x + fz * z) - self.near),
+            (-fx, 0.0, -fz, (fx * x + fz * z) + self.far),
+        ]
+
+    def intersects_box(self, bounds):
+        """
+        Test boîte englobante (min_x, min_y, min_z, max_x, max_y, max_z) / frustum.
+        Conservatif : peut accepter une boîte juste hors champ, jamais rejeter une boîte visible.
+        """
+        min_x, min_y, min_z, max_x, max_y, max_z = bounds
+        for nx, ny, nz, d in self.planes:
+            # Coin de la boîte le plus loin dans le sens de la normale
+            px = max_x if nx >= 0 else min_x
+            py = max_y if ny >= 0 else min_y
+            pz = max_z if nz >= 0 else min_z
+            if nx * px + ny * py + nz * pz + d < 0:
+                return False
+        return True
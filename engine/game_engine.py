@@ -1,11 +1,15 @@
 # engine/game_engine.py
 
+import math
 import pygame
 from engine.input_manager import InputManager
 from engine.renderer import Renderer
 from world.map import GameMap
 from objects.player import Player
-from config import TARGET_FPS, DEFAULT_MAP
+from objects.foe import Foe
+from objects.item import PICKUP_RADIUS
+from ai.foe_batch import FoeBatch
+from config import TARGET_FPS, DEFAULT_MAP, BATCHED_FOE_AI
 
 
 
@@ -39,24 +43,33 @@ class GameEngine:
         if spawn_id and spawn_id in spawn_points:
             # Position trouvée par ID
             pos = spawn_points[spawn_id]
-            return pos[0], pos[1]
+            return self._snap_to_floor(pos[0], pos[1])
         elif spawn_points:
             # Prend le premier point de spawn de la liste
             first_key = list(spawn_points.keys())[0]
             pos = spawn_points[first_key]
-            return pos[0], pos[1]
+            return self._snap_to_floor(pos[0], pos[1])
         else:
             # Fallback si aucun point de spawn n'est défini
             print("AVERTISSEMENT: Aucun point de spawn trouvé, utilisation d'une position par défaut.")
             return self._find_free_cell()
 
 
+    def _snap_to_floor(self, x, y):
+        """Un point de spawn placé dans un mur est déplacé au centre du sol le plus proche."""
+        cell_x, cell_y = int(math.floor(x)), int(math.floor(y))
+        if self.game_map.is_walkable(cell_x, cell_y):
+            return x, y
+        cell = self.game_map.nearest_floor_cell(cell_x, cell_y)
+        if cell is None:
+            return x, y
+        return (cell[0] + 0.5, cell[1] + 0.5)
+
     def _find_free_cell(self):
         """Trouve une case de sol libre pour faire apparaître le joueur."""
-        for y, row in enumerate(self.game_map.grid):
-            for x, cell in enumerate(row):
-                if cell in self.game_map.floor_textures:
-                    return (x + 0.5, y + 0.5) # Centré sur la tuile
+        cell = self.game_map.find_free_cell()
+        if cell is not None:
+            return (cell[0] + 0.5, cell[1] + 0.5) # Centré sur la tuile
         return (1.5, 1.5) # Fallback
 
     def load_resources(self):
@@ -64,7 +77,13 @@ class GameEngine:
         self.game_map.load_from_file(self.map_path) 
         self.pnjs = self.game_map.get_initial_pnjs(self.game_session)
         self.items = self.game_map.get_initial_items(self.game_session)
+        # Ennemis simulés en lot : les objets Foe ne sont plus que des vues sur ses tableaux
+        self.foe_batch = FoeBatch(pnj for pnj in self.pnjs if isinstance(pnj, Foe)) if BATCHED_FOE_AI else None
         self.renderer.load_textures()
+        # Le maillage 3D du niveau est statique : on le construit une seule fois ici,
+        # avec le PVS qui permet d'ignorer les zones masquées par les murs
+        self.game_map.build_pvs()
+        self.renderer.build_world_mesh(self.game_map)
 
     def update(self, delta_time):
         """
@@ -113,10 +132,10 @@ class GameEngine:
                 check_x = int(target_x)
                 check_y = int(-target_z)
                 
-                if 0 <= check_y < len(self.game_map.grid) and 0 <= check_x < len(self.game_map.grid[0]):
-                    cell_value = self.game_map.grid[check_y][check_x]
+                if self.game_map.in_bounds(check_x, check_y):
+                    cell_value = self.game_map.get_cell_value(check_x, check_y)
                     
-                    if hasattr(self.game_map, 'doors_config') and cell_value in self.game_map.doors_config:
+                    if self.game_map.door[check_y, check_x]:
                         door_data = self.game_map.doors_config[cell_value]
                         print(f"!!! PORTE ACTIVÉE (Distance {dist}m) !!! Vers {door_data['target_map']}")
                         return {"type": "EXIT_TO_MAP", "target": door_data["target_map"]}
@@ -135,26 +154,38 @@ class GameEngine:
         move_vector = self.input_manager.get_movement_vector()
         mouse_delta = self.input_manager.get_mouse_delta()
         self.player.update(move_vector, mouse_delta, delta_time, self.game_map)
+        # Champ de vision du joueur, lu par le tir, les ennemis, le rendu et la mini-carte
+        # (recalculé seulement s'il change de case ou si une porte s'ouvre)
+        player_cell = int(self.player.position[0]), int(-self.player.position[2])
+        self.game_map.field_of_view.update(*player_cell)
 
         # 4. Logique de tir
         if self.input_manager.is_mouse_held():
-            self.player.fire(self.pnjs, self.game_map)
+            self.player.fire(self.game_map)
 
         # 5. Mise à jour des PNJ et items
+        # Champ de flux vers le joueur, lu par les ennemis en poursuite (recalculé s'il change de case)
+        self.game_map.flow_field.update(*player_cell)
+        if self.foe_batch is not None:
+            self.foe_batch.update(self.player, delta_time, self.game_map, self.renderer)
         for pnj in self.pnjs: 
-            pnj.update(self.player, delta_time, self.game_map, self.renderer)
+            if self.foe_batch is None or not isinstance(pnj, Foe):
+                pnj.update(self.player, delta_time, self.game_map, self.renderer)
             
             if pnj.health <= 0:
                 if self.game_session and not self.game_session.is_flagged(self.map_path, "killed", pnj.id):
                     self.game_session.register_action(self.map_path, "killed", pnj.id)
                     print(f"[PERSISTANCE] Mort enregistrée : {pnj.id}")
 
-        for item in self.items: 
+        # Seuls les items à portée de ramassage sont examinés (hachage spatial de la carte)
+        nearby_items = self.game_map.item_hash.query_radius(self.player.position[0], self.player.position[2], PICKUP_RADIUS)
+        for item in nearby_items:
             was_collected = item.collected
             item.update(self.player, delta_time)
             
             # Si l'item vient d'être ramassé
             if not was_collected and item.collected:
+                self.game_map.item_hash.remove(item)
                 if self.game_session:
                     self.game_session.register_action(self.map_path, "collected", item.id)
                     print(f"[PERSISTANCE] Ramassage enregistré : {item.id}")
@@ -171,13 +202,17 @@ class GameEngine:
 
         return None
 
+    def release(self):
+        """Libère les ressources GPU du niveau (textures rendues au registre partagé)."""
+        self.renderer.release()
+
     def render(self):
         """Gère tout le rendu graphique."""
         self.renderer.clear()
         self.renderer.render_player(self.player)
         self.renderer.render_world(self.game_map)
-        self.renderer.render_pnjs(self.pnjs)
-        self.renderer.render_entities(self.items)
+        self.renderer.render_pnjs(self.pnjs, self.game_map)
+        self.renderer.render_entities(self.items, self.game_map)
         self.renderer.render_hud(self.player, self.pnjs, self.items, self.game_map)
         self.renderer.swap_buffers()
 
@@ -0,0 +1,155 @@
+# engine/hud.py
+
+import numpy as np
+from OpenGL.GL import *
+
+MINIMAP_TILE_SIZE = 4
+MINIMAP_MARGIN = 20
+MINIMAP_WALL_COLOR = (51, 51, 51, 255)
+MINIMAP_FLOOR_COLOR = (153, 153, 153, 255)
+MINIMAP_FOG_COLOR = (0, 0, 0, 0)  # Cases encore jamais vues (transparentes)
+
+
+class RetainedLayer:
+    """
+    Élément d'interface en mode "retenu" : les appels OpenGL d'une fonction de dessin
+    sont enregistrés dans une display list, rejouée telle quelle à chaque frame.
+    La liste n'est recompilée que lorsque la clé d'état (valeurs affichées) change.
+    """
+    def __init__(self):
+        self.list_id = None
+        self.key = None
+        self.rebuilds = 0
+
+    def draw(self, key, build):
+        if self.list_id is None or key != self.key:
+            if self.list_id is None:
+                self.list_id = glGenLists(1)
+            glNewList(self.list_id, GL_COMPILE)
+            build()
+            glEndList()
+            self.key = key
+            self.rebuilds += 1
+        glCallList(self.list_id)
+
+    def invalidate(self):
+        self.key = None
+
+    def release(self):
+        if self.list_id is not None:
+            glDeleteLists(self.list_id, 1)
+        self.list_id = None
+        self.key = None
+
+
+class MiniMap:
+    """
+    Mini-carte en deux couches :
+    - le fond statique (murs/sols) rendu une seule fois par carte dans une texture
+      (un pixel par case, agrandi avec un filtrage GL_NEAREST), sous un brouillard de
+      guerre : seules les cases déjà vues (FieldOfView.explored) sont dessinées, et
+      chaque nouveau champ de vision n'envoie au GPU que sa fenêtre (glTexSubImage2D) ;
+    - les marqueurs (joueur, PNJ) regroupés en un seul tableau de quads colorés par frame.
+    """
+    def __init__(self, tile_size=MINIMAP_TILE_SIZE):
+        self.tile_size = tile_size
+        self.texture_id = None
+        self.game_map = None
+        self.width = 0
+        self.height = 0
+        self.pixels = None  # Fond sans brouillard (H, W, 4)
+        self.fog_revision = None  # Révision du champ de vision déjà affichée
+
+    def build(self, game_map):
+        """Construit la texture de fond de la carte (à refaire seulement si la carte change)."""
+        self.release()
+        self.game_map = game_map
+        self.height, self.width = game_map.opaque.shape
+        if not self.width:
+            return
+
+        self.pixels = np.where(game_map.opaque[:, :, None], MINIMAP_WALL_COLOR, MINIMAP_FLOOR_COLOR).astype(np.uint8)
+        explored = game_map.field_of_view.explored
+        if explored.shape != self.pixels.shape[:2]:
+            explored = np.zeros(self.pixels.shape[:2], dtype=bool)
+        pixels = np.where(explored[:, :, None], self.pixels, np.array(MINIMAP_FOG_COLOR, dtype=np.uint8))
+        self.fog_revision = game_map.field_of_view.revision
+
+        self.texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.width, self.height, 0, GL_RGBA, GL_UNSIGNED_BYTE, pixels.tobytes())
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+
+    def reveal(self, field_of_view):
+        """
+        Découvre les cases vues depuis le dernier appel. Un seul recalcul du champ de
+        vision : seule sa fenêtre est renvoyée ; plusieurs : toute la texture.
+        """
+        if self.texture_id is None or field_of_view.revision == self.fog_revision:
+            return
+        explored = field_of_view.explored
+        if explored.shape != self.pixels.shape[:2]:
+            return
+        if field_of_view.revision == self.fog_revision + 1:
+            x0, y0, x1, y1 = field_of_view.bounds()
+        else:
+            x0, y0, x1, y1 = 0, 0, self.width, self.height
+        self.fog_revision = field_of_view.revision
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        region = np.where(explored[y0:y1, x0:x1, None], self.pixels[y0:y1, x0:x1],
+                          np.array(MINIMAP_FOG_COLOR, dtype=np.uint8))
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x0, y0, x1 - x0, y1 - y0, GL_RGBA, GL_UNSIGNED_BYTE,
+                        np.ascontiguousarray(region).tobytes())
+
+    def draw(self, origin_x, origin_y, markers):
+        """
+        Dessine le fond puis les marqueurs.
+        `markers` : liste de (case_x, case_y, couleur RGB 0..1).
+        """
+        if self.texture_id is None:
+            return
+        w, h = self.width * self.tile_size, self.height * self.tile_size
+
+        # Fond : un seul quad texturé (la ligne 0 de la grille est en haut)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glBegin(GL_QUADS)
+        glTexCoord2f(0, 0); glVertex2f(origin_x, origin_y)
+        glTexCoord2f(1, 0); glVertex2f(origin_x + w, origin_y)
+        glTexCoord2f(1, 1); glVertex2f(origin_x + w, origin_y + h)
+        glTexCoord2f(0, 1); glVertex2f(origin_x, origin_y + h)
+        glEnd()
+
+        if not markers:
+            return
+
+        cells = np.array([(x, y) for x, y, _ in markers], dtype=np.float32)
+        colors = np.repeat(np.array([color for _, _, color in markers], dtype=np.float32), 4, axis=0)
+        corners = np.array([(0, 0), (1, 0), (1, 1), (0, 1)], dtype=np.float32)
+        vertices = ((cells[:, None, :] + corners[None, :, :]) * self.tile_size + (origin_x, origin_y)).reshape(-1, 2).astype(np.float32)
+
+        glDisable(GL_TEXTURE_2D)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, vertices)
+        glColorPointer(3, GL_FLOAT, 0, colors)
+        glDrawArrays(GL_QUADS, 0, len(vertices))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glColor3f(1, 1, 1)
+        glEnable(GL_TEXTURE_2D)
+
+    def release(self):
+        if self.texture_id is not None:
+            glDeleteTextures(int(self.texture_id))
+        self.texture_id = None
+        self.game_map = None
+        self.pixels = None
+        self.fog_revision = None
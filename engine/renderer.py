@@ -3,19 +3,36 @@
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import pygame
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, FOV, NEAR_CLIP, FAR_CLIP, BACKGROUND_COLOR, TEXTURES_PATH
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, FOV, NEAR_CLIP, FAR_CLIP, BACKGROUND_COLOR, TEXTURES_PATH, USE_TEXTURE_ATLAS
 import os
-import pygame.freetype  # en haut du fichier
-from PIL import Image
 import numpy as np
+from engine.world_mesh import WorldMesh
+from engine.texture_atlas import TextureAtlas
+from engine.frustum import Frustum
+from engine.sprite_batch import SpriteBatch
+from engine.text_renderer import get_text_renderer
+from engine.hud import RetainedLayer, MiniMap, MINIMAP_MARGIN
+from engine.texture_manager import TextureSet
+
+# Dossiers des textures du rendu 3D
+TEXTURE_FOLDERS = [TEXTURES_PATH, "assets/sprites/", "assets/pnj/", "assets/ui/", "assets/weapons/"]
 
 class Renderer:
     def __init__(self, screen):
         self.damage_overlay_timer = 0.0
         self.screen = screen
         self._init_opengl()
-        self.textures = {}
-        self.font = pygame.freetype.Font("assets/ui/PressStart2P-Regular.ttf", 16)
+        self.textures = TextureSet(GL_LINEAR)  # nom -> ID OpenGL, envoyée au GPU à la première demande
+        self.world_mesh = None
+        self.texture_atlas = None
+        self.frustum = Frustum()
+        self.sprite_batch = SpriteBatch()
+        self.camera_rotation_y = 0.0
+        self.render_stats = {"chunks_drawn": 0, "chunks_culled": 0, "chunks_occluded": 0, "sprites_occluded": 0}  # Compteurs de la dernière frame
+        self.text_renderer = get_text_renderer(16)
+        self.mini_map = MiniMap()
+        # Éléments du HUD recompilés seulement quand les valeurs du joueur changent
+        self.hud_layers = {"status": RetainedLayer(), "inventory": RetainedLayer(), "ammo": RetainedLayer()}
 
     # dans engine/renderer.py
 
@@ -43,86 +60,95 @@ class Renderer:
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
     def load_textures(self):
-        for folder in [TEXTURES_PATH, "assets/sprites/", "assets/pnj/", "assets/ui/", "assets/weapons/"]:
-            for root, _, files in os.walk(folder):
-                for file in files:
-                    if not file.lower().endswith((".png", ".jpg", ".bmp")):
-                        continue
-          
-                    path = os.path.join(root, file)
-                    try:
-                        texture_id = self._load_texture(path)
-                        relative_path = os.path.relpath(path, "assets").replace("\\", "/")
-                        self.textures[relative_path] = texture_id
-                        path = os.path.join(root, file)
-                        self.textures[file] = texture_id
+        # Simple indexation des fichiers : chaque texture n'est envoyée au GPU
+        # (depuis le registre partagé) que la première fois qu'elle est dessinée
+        self.textures.add_folders(TEXTURE_FOLDERS, short_names=True)
+        print(f"{len(self.textures.paths)} textures indexées")
 
+    def release(self):
+        """Libère les ressources GPU de ce renderer (à la sortie de l'état de jeu)."""
+        self.textures.release()
 
-                        print(f"Texture chargée : {file} → ID OpenGL : {texture_id}")
-                    except Exception as e:
-                        print(f"Erreur chargement texture : {file} → {e}")
+        if self.world_mesh is not None:
+            self.world_mesh.release()
+            self.world_mesh = None
+        if self.texture_atlas is not None:
+            self.texture_atlas.release()
+            self.texture_atlas = None
+        self.sprite_batch.release()
+        self.mini_map.release()
+        for layer in self.hud_layers.values():
+            layer.release()
 
 
 
     def _draw_text(self, text, x, y):
-        # Rendre le texte sur une surface Pygame avec antialiasing (blanc sur transparent)
-        surface, _ = self.font.render(text, (255, 255, 255))
-
-        # Convertir la surface en chaîne de bytes pour OpenGL (format RGBA)
-        texture_data = pygame.image.tostring(surface, "RGBA", True)
-
-        # Obtenir les dimensions de la surface (en pixels)
-        width, height = surface.get_size()
-
-        # Générer une nouvelle texture OpenGL
-        texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-
-        # Charger les données de la surface dans OpenGL
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-
-        # Appliquer un filtrage linéaire pour lisser la texture
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-
-        # Activer la texturation 2D
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, texture_id)
+        """Dessine du texte via l'atlas de glyphes partagé (aucune texture créée par appel)."""
+        self.text_renderer.draw(text, x, y)
 
-        # Rendu de la texture avec inversion horizontale et verticale via coordonnées UV inversées
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 1); glVertex2f(x, y)                      # coin supérieur gauche
-        glTexCoord2f(1, 1); glVertex2f(x + width, y)              # coin supérieur droit
-        glTexCoord2f(1, 0); glVertex2f(x + width, y + height)     # coin inférieur droit
-        glTexCoord2f(0, 0); glVertex2f(x, y + height)             # coin inférieur gauche
-        glEnd()
-        glDeleteTextures(int(texture_id))
-
-        # Nettoyage : suppression de la texture temporaire
-        #glDeleteTextures(texture_id)
-
-    def _load_texture(self, path):
-        
-
-        surface = pygame.image.load(path)
-        image_data = pygame.image.tostring(surface, "RGBA", True)
-        width, height = surface.get_size()
+    def build_world_mesh(self, game_map):
+        """
+        Construit le maillage statique (VBO) de la carte. À appeler une seule fois
+        par chargement de carte : render_world ne régénère plus la géométrie.
+        """
+        if self.world_mesh is not None:
+            self.world_mesh.release()
 
-        texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, image_data)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        # Atlas des textures murs/sols réellement utilisées par la carte
+        if self.texture_atlas is not None:
+            self.texture_atlas.release()
+            self.texture_atlas = None
+        if USE_TEXTURE_ATLAS:
+            texture_names = [t for t in list(game_map.wall_textures.values()) + list(game_map.floor_textures.values()) if isinstance(t, str)]
+            self.texture_atlas = TextureAtlas()
+            if not self.texture_atlas.build(texture_names):
+                self.texture_atlas = None
 
-        return texture_id
+        self.world_mesh = WorldMesh()
+        self.world_mesh.build(game_map, self.texture_atlas)
 
+        # Le fond de la mini-carte est lui aussi statique pour une carte donnée
+        self.mini_map.build(game_map)
 
     def render_world(self, game_map):
-       
-        for wall in game_map.get_wall_geometry():
-            self._draw_quad(wall["vertices"], wall["texture"])
-
-        for floor in game_map.get_floor_geometry():
-            self._draw_quad(floor["vertices"], floor["texture"])
+        # Filet de sécurité : si le maillage n'a pas été construit au chargement
+        if self.world_mesh is None:
+            self.build_world_mesh(game_map)
+
+        camera_cell = self._camera_cell()
+        visible_chunks = game_map.get_visible_chunks(*camera_cell) if camera_cell else None
+
+        self.world_mesh.draw(self.textures, self.frustum, visible_chunks)
+        self.render_stats["chunks_drawn"] = self.world_mesh.chunks_drawn
+        self.render_stats["chunks_culled"] = self.world_mesh.chunks_culled
+        self.render_stats["chunks_occluded"] = self.world_mesh.chunks_occluded
+        self.render_stats["sprites_occluded"] = 0
+
+    def _camera_cell(self):
+        """Case de la grille occupée par la caméra (None avant le premier render_player)."""
+        position = getattr(self, "camera_position", None)
+        if position is None:
+            return None
+        return int(position[0]), int(-position[2])
+
+    def _filter_visible(self, objects, game_map):
+        """
+        Retire les objets dont la case n'est pas dans le PVS de la case caméra, ni près
+        d'une case du champ de vision du joueur (s'il est à jour pour cette case).
+        """
+        camera_cell = self._camera_cell()
+        if game_map is None or camera_cell is None:
+            return objects
+        fov = game_map.field_of_view if game_map.field_of_view.is_current(*camera_cell) else None
+        visible = []
+        for obj in objects:
+            cell_x, cell_y = int(obj.position[0]), int(-obj.position[2])
+            if fov is not None and not fov.may_see(cell_x, cell_y):
+                continue
+            if game_map.is_cell_visible(camera_cell[0], camera_cell[1], cell_x, cell_y):
+                visible.append(obj)
+        self.render_stats["sprites_occluded"] += len(objects) - len(visible)
+        return visible
 
 
     def render_player(self, player):
@@ -130,14 +156,21 @@ class Renderer:
 
         x, y, z = player.position
         self.camera_position = player.position  # Enregistrement pour tri des entités
+        self.camera_rotation_y = player.rotation_y  # Orientation des billboards
 
         glRotatef(-player.rotation_y, 0, 1, 0)
         glTranslatef(-x, -y, -z)
 
+        # Frustum de la caméra pour le culling des chunks (même transformation)
+        self.frustum.update(player.position, player.rotation_y)
+
 
-    def render_pnjs(self, pnjs):
+    def render_pnjs(self, pnjs, game_map=None):
         from operator import itemgetter
 
+        # Les PNJ masqués par les murs (hors PVS) ne sont même pas triés
+        pnjs = self._filter_visible(pnjs, game_map)
+
         # Accès à la position caméra (le joueur doit avoir été rendu avant)
         try:
             cam_x, _, cam_z = self.camera_position  # doit être défini par render_player
@@ -155,13 +188,17 @@ class Renderer:
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
         glDepthMask(False)
 
+        self.sprite_batch.begin(self.camera_rotation_y)
         for pnj in sorted_pnjs:
             pnj.draw(self)
+        self.sprite_batch.flush()
 
         glDepthMask(True)
 
 
-    def render_entities(self, entities):
+    def render_entities(self, entities, game_map=None):
+        entities = self._filter_visible(entities, game_map)
+
         try:
             cam_x, _, cam_z = self.camera_position
         except AttributeError:
@@ -177,34 +214,20 @@ class Renderer:
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
         glDepthMask(False)
 
+        self.sprite_batch.begin(self.camera_rotation_y)
         for entity in sorted_entities:
             entity.draw(self)
+        self.sprite_batch.flush()
 
         glDepthMask(True)
 
-
-    def _draw_quad(self, vertices, texture_name):
-     
-        texture_id = self.textures.get(texture_name)
-        if texture_id is None:
-            print("Texture introuvable :", texture_name)
-            return
-
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glBegin(GL_QUADS)
-        for i, (x, y, z) in enumerate(vertices):
-            u = (i == 1 or i == 2)
-            v = (i == 2 or i == 3)
-            glTexCoord2f(u, v)
-            glVertex3f(x, y, z)
-        glEnd()
-
     def swap_buffers(self):
         pygame.display.flip()
 
     def draw_sprite(self, position, texture_name, size=0.4):
         """
-        Rendu d’un sprite orienté vers la caméra (billboarding).
+        Ajoute un sprite orienté vers la caméra (billboarding) au lot en cours.
+        Le dessin effectif a lieu en fin de render_pnjs / render_entities.
         - `position` : (x, y, z)
         - `texture_name` : nom du fichier déjà chargé dans self.textures
         - `size` : demi-largeur/hauteur du sprite
@@ -212,31 +235,7 @@ class Renderer:
         texture_id = self.textures.get(texture_name)
         if texture_id is None:
             return
-
-
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glPushMatrix()
-
-        # Placement dans le monde
-        glTranslatef(*position)
-
-        # Orientation automatique : face à la caméra (vue à la 1ère personne)
-        # On suppose que la caméra ne tourne que horizontalement (axe Y)
-        modelview = glGetFloatv(GL_MODELVIEW_MATRIX)
-        right = [modelview[0][0], modelview[1][0], modelview[2][0]]
-        up = [modelview[0][1], modelview[1][1], modelview[2][1]]
-
-        # Dessin manuel des 4 sommets avec billboarding
-        glBegin(GL_QUADS)
-        for dx, dy, u, v in [(-1, -1, 0, 0), (1, -1, 1, 0), (1, 1, 1, 1), (-1, 1, 0, 1)]:
-            x = right[0] * dx * size + up[0] * dy * size
-            y = right[1] * dx * size + up[1] * dy * size
-            z = right[2] * dx * size + up[2] * dy * size
-            glTexCoord2f(u, v)
-            glVertex3f(x, y, z)
-        glEnd()
-
-        glPopMatrix()
+        self.sprite_batch.add(position, texture_id, size)
 
     def render_hud(self, player, pnjs, items, game_map):
         """
@@ -255,15 +254,17 @@ class Renderer:
 
         glDisable(GL_DEPTH_TEST) # On désactive le test de profondeur pour le HUD
 
-        # Rendu des éléments existants
-        self._render_health_bar(player)
-        self._draw_text(f"Sante: {int(player.health)} / 100", 20, 45)
-        self._render_mini_map(player, pnjs, game_map)
-        self._render_inventory(player)
+        # Rendu des éléments existants (rejoués depuis leurs display lists si rien n'a changé)
+        # Les clés contiennent les IDs des textures : elles sont chargées avant la compilation
+        # (pas d'envoi au GPU dans une display list) et une texture rechargée après
+        # éviction invalide la liste qui l'utilisait
+        self.hud_layers["status"].draw((int(player.health), self.textures.get("life.png")), lambda: self._render_status(player))
+        self._render_mini_map(player, game_map)
+        self.hud_layers["inventory"].draw(self._inventory_key(player), lambda: self._render_inventory(player))
         self.render_weapon_hud(player)
 
         # NOUVEAU: Ajout de l'affichage des munitions
-        self._render_ammo_info(player)
+        self.hud_layers["ammo"].draw(self._ammo_key(player), lambda: self._render_ammo_info(player))
 
         # Rendu de l'effet de dégât si nécessaire
         if self.damage_overlay_timer > 0:
@@ -294,20 +295,41 @@ class Renderer:
 
             # --- CORRECTION ---
             # On calcule la largeur de chaque texte pour l'aligner correctement à droite
-            mag_surface, _ = self.font.render(mag_text, (255, 255, 255))
-            reserve_surface, _ = self.font.render(reserve_text, (255, 255, 255))
+            # (mesure en cache, sans rendu)
+            mag_width, _ = self.text_renderer.measure(mag_text)
+            reserve_width, _ = self.text_renderer.measure(reserve_text)
 
             margin = 20
-            mag_x = SCREEN_WIDTH - mag_surface.get_width() - margin
+            mag_x = SCREEN_WIDTH - mag_width - margin
             mag_y = SCREEN_HEIGHT - 80
             
-            reserve_x = SCREEN_WIDTH - reserve_surface.get_width() - margin
+            reserve_x = SCREEN_WIDTH - reserve_width - margin
             reserve_y = SCREEN_HEIGHT - 50
 
-            # On utilise notre méthode de dessin qui gère déjà la création de texture
+            # On utilise notre méthode de dessin basée sur l'atlas de glyphes
             self._draw_text(mag_text, mag_x, mag_y)
             self._draw_text(reserve_text, reserve_x, reserve_y)
 
+    def _render_status(self, player):
+        self._render_health_bar(player)
+        self._draw_text(f"Sante: {int(player.health)} / 100", 20, 45)
+
+    def _inventory_key(self, player):
+        """État affiché par l'inventaire : textures des items/armes et sélections."""
+        items = tuple(self.textures.get(self._item_sprite_name(item)) for item in player.inventory_items)
+        weapons = tuple(self.textures.get(f"weapon_{weapon.sprite}.png") for weapon in player.inventory_weapons)
+        return items, player.item_index, weapons, player.weapon_index
+
+    def _item_sprite_name(self, item):
+        if item.item_type == "potion" and hasattr(item, "effect"):
+            effect_type = item.effect.get("type")
+            return f"potion_{effect_type}.png"
+        return f"{item.item_type}.png"
+
+    def _ammo_key(self, player):
+        weapon = player.active_weapon
+        return weapon.ammo_type, weapon.ammo_loaded, weapon.mag_size, player.ammo_pool.get(weapon.ammo_type, 0)
+
     def _render_health_bar(self, player):
         texture = self.textures.get("life.png")
         if not texture:
@@ -340,27 +362,30 @@ class Renderer:
 
 
 
-    def _render_mini_map(self, player, pnjs, game_map):
-        tile_size = 4
-        map_offset_x = SCREEN_WIDTH - len(game_map.grid[0]) * tile_size - 20
-        map_offset_y = 20
+    def _render_mini_map(self, player, game_map):
+        # Le fond n'est reconstruit que si la carte a changé
+        if self.mini_map.game_map is not game_map:
+            self.mini_map.build(game_map)
+        # Cases découvertes depuis la dernière frame
+        self.mini_map.reveal(game_map.field_of_view)
 
-        for y, row in enumerate(game_map.grid):
-            for x, cell in enumerate(row):
-                color = (0.2, 0.2, 0.2) if cell in game_map.wall_textures else (0.6, 0.6, 0.6)
-                self._draw_rect_2d(map_offset_x + x * tile_size, map_offset_y + y * tile_size, tile_size, tile_size, color)
+        map_offset_x = SCREEN_WIDTH - self.mini_map.width * self.mini_map.tile_size - MINIMAP_MARGIN
+        map_offset_y = MINIMAP_MARGIN
 
         # Joueur = bleu
-        px = int(player.position[0])
-        py = int(-player.position[2])
-        self._draw_rect_2d(map_offset_x + px * tile_size, map_offset_y + py * tile_size, tile_size, tile_size, (0.0, 0.4, 1.0))
-
-        # PNJ
-        for pnj in pnjs:
-            px = int(pnj.position[0])
-            py = int(-pnj.position[2])
+        markers = [(int(player.position[0]), int(-player.position[2]), (0.0, 0.4, 1.0))]
+
+        # PNJ : seulement ceux que le joueur voit (brouillard de guerre), donc
+        # seulement ceux des cases de la fenêtre du champ de vision
+        fov = game_map.field_of_view
+        for pnj in game_map.pnj_hash.query_cells(*fov.bounds()):
+            cell_x, cell_y = int(pnj.position[0]), int(-pnj.position[2])
+            if not fov.is_visible(cell_x, cell_y):
+                continue
             color = (0.0, 1.0, 0.0) if pnj.mode == "friend" else (1.0, 0.0, 0.0)
-            self._draw_rect_2d(map_offset_x + px * tile_size, map_offset_y + py * tile_size, tile_size, tile_size, color)
+            markers.append((cell_x, cell_y, color))
+
+        self.mini_map.draw(map_offset_x, map_offset_y, markers)
 
 
     def _render_inventory(self, player):
@@ -373,13 +398,7 @@ class Renderer:
 
         # -- Inventaire d'items (potions, clés, etc.) --
         for idx, item in enumerate(player.inventory_items):
-            # ... (logique pour trouver le nom du sprite reste la même)
-            if item.item_type == "potion" and hasattr(item, "effect"):
-                effect_type = item.effect.get("type")
-                sprite_name = f"potion_{effect_type}.png"
-            else:
-                sprite_name = f"{item.item_type}.png"
-            
+            sprite_name = self._item_sprite_name(item)
             texture = self.textures.get(sprite_name)
             if not texture:
                 continue
@@ -407,7 +426,7 @@ class Renderer:
         
         total_weapons = len(player.inventory_weapons)
         for idx, weapon in enumerate(player.inventory_weapons):
-            sprite_name = f"weapon_{weapon.name}.png"
+            sprite_name = f"weapon_{weapon.sprite}.png"
             texture = self.textures.get(sprite_name)
             if not texture:
                 continue
@@ -430,18 +449,6 @@ class Renderer:
 
 
 
-    def _draw_rect_2d(self, x, y, w, h, color):
-        glDisable(GL_TEXTURE_2D)
-        glColor3f(*color)
-        glBegin(GL_QUADS)
-        glVertex2f(x, y)
-        glVertex2f(x + w, y)
-        glVertex2f(x + w, y + h)
-        glVertex2f(x, y + h)
-        glEnd()
-        glColor3f(1, 1, 1)
-        glEnable(GL_TEXTURE_2D)
-
     def _render_damage_overlay(self):
         texture = self.textures.get("blood_overlay.png")
         if not texture:
@@ -463,17 +470,16 @@ class Renderer:
 
     def render_weapon_hud(self, player):
         weapon = player.active_weapon
-        sprite_path = f"weapons/{weapon.name}/{weapon.name}_{weapon.state}.png"
+        sprite_path = f"weapons/{weapon.sprite}/{weapon.sprite}_{weapon.state}.png"
         # Détermination dynamique du sprite
-        texture_id = self.textures.get(sprite_path)
-        if not texture_id:
+        info = self.textures.info(sprite_path)
+        if not info:
             return
 
-        glBindTexture(GL_TEXTURE_2D, texture_id)
+        glBindTexture(GL_TEXTURE_2D, info.texture_id)
 
-        # Récupération de la taille de la texture à partir d'OpenGL
-        width = glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_WIDTH)
-        height = glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_HEIGHT)
+        # Taille de la texture connue depuis son chargement (plus de requête OpenGL par frame)
+        width, height = info.width, info.height
 
         # Hauteur cible = 2/3 de l'écran, largeur proportionnelle
         target_height = int(SCREEN_HEIGHT * 2 / 3)
@@ -5,11 +5,12 @@ import os
 from OpenGL.GL import *
 from config import SCREEN_WIDTH, SCREEN_HEIGHT, OVERWORLD_TILES_PER_SCREEN_HEIGHT
 from world.sprite_analyzer import LOGO_SIZE
+from engine.texture_manager import TextureSet
 
 class Renderer2D:
     def __init__(self, screen):
         self.screen = screen
-        self.textures = {}
+        self.textures = TextureSet(GL_NEAREST)
         self.camera_x = 0
         self.camera_y = 0
         self.tile_size = SCREEN_HEIGHT / OVERWORLD_TILES_PER_SCREEN_HEIGHT
@@ -25,34 +26,29 @@ class Renderer2D:
         self._load_textures()
 
     def _load_textures(self):
-        """Charge toutes les textures nécessaires au mode 2D."""
-        for folder in ["assets/textures/", "assets/sprites/", "assets/pnj/"]:
-            for root, _, files in os.walk(folder):
-                for file in files:
-                    if file.lower().endswith((".png", ".jpg", ".bmp")):
-                        path = os.path.join(root, file)
-                        try:
-                            surface = pygame.image.load(path).convert_alpha()
-                            image_data = pygame.image.tostring(surface, "RGBA", True)
-                            width, height = surface.get_size()
-
-                            texture_id = glGenTextures(1)
-                            glBindTexture(GL_TEXTURE_2D, texture_id)
-                            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, image_data)
-                            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
-                            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
-
-                            relative_path = os.path.relpath(path, "assets").replace("\\", "/")
-                            self.textures[relative_path] = texture_id
-                        except Exception as e:
-                            print(f"Erreur chargement texture 2D : {file} -> {e}")
+        """Indexe les textures du mode 2D (envoyées au GPU à leur premier dessin)."""
+        self.textures.add_folders(["assets/textures/", "assets/sprites/", "assets/pnj/"])
+
+    def release(self):
+        """Rend au registre les textures prises par ce renderer."""
+        self.textures.release()
 
     def draw_map(self, game_map):
         """Dessine le calque du sol et des murs de la carte, gérant textures et couleurs."""
-        for y, row in enumerate(game_map.grid):
-            for x, cell in enumerate(row):
-                if cell in game_map.floor_textures:
-                    floor_data = game_map.floor_textures[cell]
+        # Sol de chaque ID de tuile (None si la tuile n'est pas un sol)
+        floor_by_tile = [game_map.floor_textures.get(cell) if cell is not None else None for cell in game_map.tile_palette]
+
+        # Seules les cases à l'écran sont parcourues
+        x_start = max(0, int(self.camera_x // self.tile_size))
+        y_start = max(0, int(self.camera_y // self.tile_size))
+        x_end = min(game_map.width, int((self.camera_x + SCREEN_WIDTH) // self.tile_size) + 1)
+        y_end = min(game_map.height, int((self.camera_y + SCREEN_HEIGHT) // self.tile_size) + 1)
+
+        for y in range(y_start, y_end):
+            row = game_map.tiles[y].tolist()
+            for x in range(x_start, x_end):
+                floor_data = floor_by_tile[row[x]]
+                if floor_data is not None:
                     
                     if isinstance(floor_data, str):
                         texture_id = self.textures.get(f"textures/{floor_data}")
@@ -0,0 +1,87 @@
+# engine/sprite_batch.py
+
+import math
+import numpy as np
+from OpenGL.GL import *
+from engine.world_mesh import VERTEX_SIZE, VERTEX_STRIDE, POSITION_OFFSET, UV_OFFSET
+
+# Coins d'un billboard : (dx, dy, u, v), même ordre que l'ancien Renderer.draw_sprite
+SPRITE_CORNERS = np.array([(-1, -1, 0, 0), (1, -1, 1, 0), (1, 1, 1, 1), (-1, 1, 0, 1)], dtype=np.float32)
+
+
+class SpriteBatch:
+    """
+    Regroupe les billboards d'une frame dans un seul tableau de sommets.
+    Les vecteurs droite/haut de la caméra sont calculés une fois par frame
+    à partir du lacet du joueur (plus de glGetFloatv ni de push/pop de matrice).
+    L'ordre d'ajout (tri arrière -> avant) est conservé pour la transparence :
+    un appel de dessin par suite consécutive de sprites de même texture.
+    """
+    def __init__(self):
+        self.vbo = None
+        self.right = np.array((1.0, 0.0, 0.0), dtype=np.float32)
+        self.up = np.array((0.0, 1.0, 0.0), dtype=np.float32)
+        self._positions = []
+        self._sizes = []
+        self._texture_ids = []
+        self._data = np.empty((0, VERTEX_SIZE), dtype=np.float32)
+
+    def begin(self, rotation_y):
+        """Démarre un lot. La caméra ne tourne qu'autour de Y : haut = (0, 1, 0)."""
+        rad = math.radians(-rotation_y)
+        self.right[0], self.right[2] = math.cos(rad), math.sin(rad)
+        self._positions.clear()
+        self._sizes.clear()
+        self._texture_ids.clear()
+
+    def add(self, position, texture_id, size):
+        self._positions.append(position)
+        self._sizes.append(size)
+        self._texture_ids.append(texture_id)
+
+    def flush(self):
+        """Remplit le tableau de sommets et dessine tout le lot."""
+        count = len(self._positions)
+        if count == 0:
+            return
+
+        # Tampon réutilisé d'une frame à l'autre, agrandi seulement si nécessaire
+        if len(self._data) < count * 4:
+            self._data = np.empty((max(count * 4, len(self._data) * 2), VERTEX_SIZE), dtype=np.float32)
+        data = self._data[:count * 4].reshape(count, 4, VERTEX_SIZE)
+
+        positions = np.asarray(self._positions, dtype=np.float32)
+        sizes = np.asarray(self._sizes, dtype=np.float32)
+        offsets = SPRITE_CORNERS[:, 0:1] * self.right + SPRITE_CORNERS[:, 1:2] * self.up
+        data[:, :, 0:3] = positions[:, None, :] + offsets[None, :, :] * sizes[:, None, None]
+        data[:, :, 3:5] = SPRITE_CORNERS[:, 2:4]
+
+        if self.vbo is None:
+            self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, count * 4 * VERTEX_STRIDE, self._data[:count * 4], GL_STREAM_DRAW)
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, POSITION_OFFSET)
+        glTexCoordPointer(2, GL_FLOAT, VERTEX_STRIDE, UV_OFFSET)
+
+        run_start = 0
+        for i in range(1, count + 1):
+            if i == count or self._texture_ids[i] != self._texture_ids[run_start]:
+                glBindTexture(GL_TEXTURE_2D, self._texture_ids[run_start])
+                glDrawArrays(GL_QUADS, run_start * 4, (i - run_start) * 4)
+                run_start = i
+
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        self._positions.clear()
+        self._sizes.clear()
+        self._texture_ids.clear()
+
+    def release(self):
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+        self.vbo = None
@@ -0,0 +1,149 @@
+# engine/text_renderer.py
+
+import numpy as np
+import pygame
+from OpenGL.GL import *
+
+FONT_PATH = "assets/ui/PressStart2P-Regular.ttf"
+
+# Caractères pré-rendus dans l'atlas : ASCII imprimable + Latin-1 (accents français)
+GLYPH_CHARSET = "".join(chr(c) for c in list(range(32, 127)) + list(range(160, 256)))
+ATLAS_WIDTH = 1024
+LAYOUT_CACHE_LIMIT = 256  # Chaînes gardées dans chaque cache (tailles, quads) avant de le vider
+
+_renderers = {}
+
+
+def get_text_renderer(size):
+    """
+    Retourne le TextRenderer partagé pour une taille de police donnée.
+    Le contexte OpenGL vit aussi longtemps que la fenêtre : l'atlas de glyphes
+    n'est donc construit qu'une fois par taille, quel que soit l'état actif.
+    """
+    if size not in _renderers:
+        _renderers[size] = TextRenderer(size)
+    return _renderers[size]
+
+
+class TextRenderer:
+    """
+    Service de texte commun au HUD et aux menus.
+    Les glyphes de PressStart2P sont rendus une seule fois dans un atlas OpenGL ;
+    une chaîne est ensuite dessinée comme un lot de quads texturés (un seul appel).
+    Les mesures et la géométrie de chaque chaîne sont mises en cache : le mode
+    `dry_run` des anciens _draw_text ne rastérise plus rien.
+    """
+    def __init__(self, size):
+        try:
+            font = pygame.font.Font(FONT_PATH, size)
+        except (pygame.error, FileNotFoundError):
+            font = pygame.font.Font(None, int(size * 5 / 3))
+
+        self.size = size
+        self.line_height = font.get_height()
+        self.glyphs = {}  # caractère -> (largeur, u0, v0, u1, v1)
+        self._sizes = {}  # texte -> (largeur, hauteur)
+        self._layouts = {}  # texte -> (sommets, uv, nombre_de_sommets)
+        self.texture_id = self._bake_atlas(font)
+
+    def _bake_atlas(self, font):
+        """Rend chaque glyphe du jeu de caractères dans une seule texture."""
+        surfaces = {}
+        for char in GLYPH_CHARSET:
+            try:
+                surfaces[char] = font.render(char, True, (255, 255, 255))
+            except pygame.error:
+                continue  # Glyphe de largeur nulle (ex : trait d'union conditionnel)
+
+        # Rangement en lignes de hauteur fixe
+        positions = {}
+        x, y = 0, 0
+        for char, surface in surfaces.items():
+            width = surface.get_width()
+            if x + width > ATLAS_WIDTH:
+                x, y = 0, y + self.line_height + 1
+            positions[char] = (x, y)
+            x += width + 1
+        atlas_height = y + self.line_height
+
+        atlas = pygame.Surface((ATLAS_WIDTH, atlas_height), pygame.SRCALPHA)
+        for char, surface in surfaces.items():
+            atlas.blit(surface, positions[char])
+            gx, gy = positions[char]
+            width = surface.get_width()
+            # L'upload retourne l'image verticalement : v = 1 en haut de l'atlas
+            self.glyphs[char] = (
+                width,
+                gx / ATLAS_WIDTH,
+                1.0 - gy / atlas_height,
+                (gx + width) / ATLAS_WIDTH,
+                1.0 - (gy + self.line_height) / atlas_height
+            )
+
+        texture_data = pygame.image.tostring(atlas, "RGBA", True)
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, ATLAS_WIDTH, atlas_height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        return texture_id
+
+    def _glyph(self, char):
+        return self.glyphs.get(char) or self.glyphs["?"]
+
+    def measure(self, text):
+        """Largeur et hauteur en pixels du texte, sans aucun rendu."""
+        size = self._sizes.get(text)
+        if size is None:
+            if len(self._sizes) >= LAYOUT_CACHE_LIMIT:
+                self._sizes.clear()
+            size = (sum(self._glyph(char)[0] for char in text), self.line_height)
+            self._sizes[text] = size
+        return size
+
+    def _layout(self, text):
+        """Quads de la chaîne, relatifs à son coin supérieur gauche (mis en cache)."""
+        layout = self._layouts.get(text)
+        if layout is not None:
+            return layout
+
+        if len(self._layouts) >= LAYOUT_CACHE_LIMIT:
+            self._layouts.clear()
+
+        vertices = np.empty((len(text) * 4, 2), dtype=np.float32)
+        uvs = np.empty((len(text) * 4, 2), dtype=np.float32)
+        x, h = 0.0, self.line_height
+        for i, char in enumerate(text):
+            width, u0, v0, u1, v1 = self._glyph(char)
+            vertices[i * 4:i * 4 + 4] = ((x, 0), (x + width, 0), (x + width, h), (x, h))
+            uvs[i * 4:i * 4 + 4] = ((u0, v0), (u1, v0), (u1, v1), (u0, v1))
+            x += width
+
+        layout = (vertices, uvs, len(text) * 4)
+        self._layouts[text] = layout
+        return layout
+
+    def draw(self, text, x, y, color=(255, 255, 255)):
+        """Dessine le texte (coin supérieur gauche en x, y) dans la projection 2D courante."""
+        if not text:
+            return
+        vertices, uvs, count = self._layout(text)
+
+        glEnable(GL_TEXTURE_2D)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glColor4f(color[0] / 255.0, color[1] / 255.0, color[2] / 255.0, 1.0)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+
+        glPushMatrix()
+        glTranslatef(x, y, 0)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, vertices)
+        glTexCoordPointer(2, GL_FLOAT, 0, uvs)
+        glDrawArrays(GL_QUADS, 0, count)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glPopMatrix()
+
+        glColor4f(1.0, 1.0, 1.0, 1.0)
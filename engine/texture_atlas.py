@@ -0,0 +1,141 @@
+# engine/texture_atlas.py
+
+import hashlib
+import json
+import math
+import os
+import pygame
+from OpenGL.GL import *
+from config import TEXTURES_PATH, CACHE_PATH, ATLAS_TILE_SIZE, ATLAS_PADDING
+
+# À incrémenter si le format du cache (image ou layout) change
+ATLAS_VERSION = 1
+ATLAS_CACHE_PATH = os.path.join(CACHE_PATH, "atlas")
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class TextureAtlas:
+    """
+    Regroupe les textures de murs/sols d'une carte dans une seule texture OpenGL.
+    Chaque texture source devient une tuile carrée (avec une bordure répliquée
+    pour éviter les fuites du filtrage linéaire) et `uv_rects` donne, pour
+    chaque nom, son rectangle (u0, v0, u1, v1) dans l'atlas.
+    Le résultat est mis en cache sur disque, indexé par le hash des fichiers sources.
+    """
+    def __init__(self, tile_size=ATLAS_TILE_SIZE, padding=ATLAS_PADDING):
+        self.tile_size = tile_size
+        self.padding = padding
+        self.texture_id = None
+        self.uv_rects = {}
+
+    def build(self, texture_names):
+        """Construit (ou recharge depuis le cache) l'atlas pour les textures demandées."""
+        self.release()
+
+        sources = {}
+        for name in sorted(set(texture_names)):
+            path = os.path.join(TEXTURES_PATH, name)
+            if os.path.exists(path):
+                sources[name] = path
+            else:
+                print(f"Texture d'atlas introuvable : {path}")
+        if not sources:
+            return False
+
+        cache_key = self._cache_key(sources)
+        image_path = os.path.join(ATLAS_CACHE_PATH, f"{cache_key}.png")
+        layout_path = os.path.join(ATLAS_CACHE_PATH, f"{cache_key}.json")
+
+        if os.path.exists(image_path) and os.path.exists(layout_path):
+            surface = pygame.image.load(image_path)
+            with open(layout_path, "r") as f:
+                self.uv_rects = {name: tuple(rect) for name, rect in json.load(f)["uv_rects"].items()}
+            print(f"Atlas chargé depuis le cache : {image_path}")
+        else:
+            surface = self._compose(sources)
+            try:
+                os.makedirs(ATLAS_CACHE_PATH, exist_ok=True)
+                pygame.image.save(surface, image_path)
+                with open(layout_path, "w") as f:
+                    json.dump({"version": ATLAS_VERSION, "uv_rects": self.uv_rects}, f, indent=4)
+            except (OSError, pygame.error) as e:
+                print(f"Impossible d'écrire le cache de l'atlas : {e}")
+
+        self._upload(surface)
+        return True
+
+    def release(self):
+        if self.texture_id is not None:
+            glDeleteTextures(int(self.texture_id))
+        self.texture_id = None
+        self.uv_rects = {}
+
+    def _cache_key(self, sources):
+        digest = hashlib.sha1(f"{ATLAS_VERSION}:{self.tile_size}:{self.padding}".encode())
+        for name, path in sources.items():
+            digest.update(f"{name}:{_file_hash(path)};".encode())
+        return digest.hexdigest()
+
+    def _compose(self, sources):
+        """Assemble les tuiles dans une surface Pygame et calcule les rectangles UV."""
+        cell = self.tile_size + 2 * self.padding
+        columns = math.ceil(math.sqrt(len(sources)))
+        rows = math.ceil(len(sources) / columns)
+        atlas_width, atlas_height = columns * cell, rows * cell
+
+        atlas = pygame.Surface((atlas_width, atlas_height), pygame.SRCALPHA)
+        self.uv_rects = {}
+
+        for index, (name, path) in enumerate(sources.items()):
+            column, row = index % columns, index // columns
+            x, y = column * cell + self.padding, row * cell + self.padding
+
+            tile = pygame.transform.smoothscale(pygame.image.load(path).convert_alpha(), (self.tile_size, self.tile_size))
+            atlas.blit(tile, (x, y))
+            self._blit_padding(atlas, tile, x, y)
+
+            # L'upload retourne l'image verticalement (v = 0 en bas de l'atlas)
+            self.uv_rects[name] = (
+                x / atlas_width,
+                (atlas_height - y - self.tile_size) / atlas_height,
+                (x + self.tile_size) / atlas_width,
+                (atlas_height - y) / atlas_height
+            )
+
+        return atlas
+
+    def _blit_padding(self, atlas, tile, x, y):
+        """Réplique les bords de la tuile dans sa marge."""
+        p, size = self.padding, self.tile_size
+        if p <= 0:
+            return
+        edges = [
+            ((0, 0, 1, size), (x - p, y), (p, size)),         # Gauche
+            ((size - 1, 0, 1, size), (x + size, y), (p, size)),  # Droite
+            ((0, 0, size, 1), (x, y - p), (size, p)),         # Haut
+            ((0, size - 1, size, 1), (x, y + size), (size, p)),  # Bas
+        ]
+        for rect, position, stretched in edges:
+            atlas.blit(pygame.transform.scale(tile.subsurface(rect), stretched), position)
+        # Coins
+        for corner_x, corner_y, dest_x, dest_y in [
+            (0, 0, x - p, y - p), (size - 1, 0, x + size, y - p),
+            (0, size - 1, x - p, y + size), (size - 1, size - 1, x + size, y + size)
+        ]:
+            atlas.fill(tile.get_at((corner_x, corner_y)), (dest_x, dest_y, p, p))
+
+    def _upload(self, surface):
+        image_data = pygame.image.tostring(surface, "RGBA", True)
+        width, height = surface.get_size()
+
+        self.texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, image_data)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
@@ -0,0 +1,278 @@
+# engine/texture_manager.py
+
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+from OpenGL.GL import *
+from config import TEXTURE_DECODE_WORKERS, TEXTURE_UPLOAD_QUEUE_SIZE, TEXTURE_VRAM_BUDGET_MB
+from engine.asset_pack import AssetPack, asset_name
+
+TEXTURE_EXTENSIONS = (".png", ".jpg", ".bmp")
+
+_manager = None
+
+
+def get_texture_manager():
+    """
+    Retourne le registre de textures du processus.
+    Le contexte OpenGL vit aussi longtemps que la fenêtre : les textures déjà
+    envoyées au GPU sont réutilisées d'un état (intérieur, overworld) à l'autre.
+    """
+    global _manager
+    if _manager is None:
+        _manager = TextureManager()
+    return _manager
+
+
+def list_texture_files(folders):
+    """Chemins de toutes les images des dossiers donnés (parcours récursif)."""
+    paths = []
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            for file in files:
+                if file.lower().endswith(TEXTURE_EXTENSIONS):
+                    paths.append(os.path.join(root, file))
+    return paths
+
+
+def decode_image(path):
+    """
+    Décode une image en octets RGBA prêts pour glTexImage2D (retournée verticalement,
+    comme pygame.image.tostring(..., True)). Sans appel OpenGL : exécutable dans un thread.
+    """
+    with Image.open(path) as image:
+        image = ImageOps.flip(image.convert("RGBA"))
+        return image.tobytes(), image.width, image.height
+
+
+class TextureInfo:
+    """Texture OpenGL résidente et ses métadonnées."""
+    def __init__(self, texture_id, width, height, filter_mode):
+        self.texture_id = texture_id
+        self.width = width
+        self.height = height
+        self.filter_mode = filter_mode
+        self.size_bytes = width * height * 4
+        self.last_used = -1  # Numéro de la dernière frame où la texture a servi
+
+
+class TextureManager:
+    """
+    Registre des textures à compteur de références.
+    Une texture est identifiée par (chemin du fichier, filtre) : le rendu 3D
+    utilise GL_LINEAR, l'overworld GL_NEAREST. Elle n'est décodée et envoyée
+    au GPU qu'au premier `acquire`. Le dernier `release` ne la supprime pas : elle
+    reste résidente, sans référence, pour l'état suivant qui en aurait besoin
+    (changement d'état : l'ancien est quitté avant que le nouveau ait rendu une frame).
+
+    La mémoire GPU occupée est bornée par TEXTURE_VRAM_BUDGET_MB : au-delà, les
+    textures sont déchargées en commençant par celles qui ne sont plus référencées,
+    puis les moins récemment utilisées (jamais celles de la frame en cours), et
+    renvoyées au GPU à leur prochaine utilisation (`use`).
+
+    Les images présentes (et à jour) dans le pack d'assets sont envoyées au GPU
+    directement depuis le fichier projeté en mémoire, sans décodage.
+    Pour les autres, le décodage peut être lancé à l'avance (`prefetch`) dans un
+    pool de threads ; les images décodées attendent dans une file bornée que le
+    thread OpenGL les envoie au GPU (`process_uploads`, avec un budget par frame).
+    """
+    def __init__(self):
+        self.entries = {}  # (chemin, filtre) -> TextureInfo, textures résidentes sur le GPU
+        self.ref_counts = {}  # (chemin, filtre) -> nombre de renderers qui utilisent la texture
+        self.budget_bytes = TEXTURE_VRAM_BUDGET_MB * 1024 * 1024
+        self.resident_bytes = 0
+        self.evictions = 0
+        self.frame = 0
+        self.pack = AssetPack()
+        if not self.pack.open():
+            self.pack = None
+        self._pending = {}  # (chemin, filtre) -> chemin, décodage lancé mais pas encore envoyé
+        self._errors = {}  # (chemin, filtre) -> exception levée par le décodage
+        self._executor = None
+        self._upload_queue = queue.Queue(maxsize=TEXTURE_UPLOAD_QUEUE_SIZE)
+
+    def _key(self, path, filter_mode):
+        return os.path.normpath(path), filter_mode
+
+    def prefetch(self, paths, filter_mode=GL_LINEAR):
+        """Lance en tâche de fond le décodage des textures qui ne sont pas encore chargées."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=TEXTURE_DECODE_WORKERS, thread_name_prefix="texture-decode")
+        for path in paths:
+            key = self._key(path, filter_mode)
+            if key in self.entries or key in self._pending:
+                continue
+            if self.pack is not None and self.pack.lookup(path) is not None:
+                continue  # Rien à décoder : acquire enverra directement les pixels du pack
+            self._pending[key] = path
+            self._executor.submit(self._decode_job, key, path)
+
+    def _decode_job(self, key, path):
+        try:
+            result = decode_image(path)
+        except Exception as e:
+            result = e
+        # Bloque le thread si la file est pleine : la mémoire des images décodées reste bornée
+        self._upload_queue.put((key, result))
+
+    def process_uploads(self, time_budget=None):
+        """
+        Envoie au GPU les images décodées disponibles, sans dépasser `time_budget`
+        secondes (None : attend et envoie tout). Retourne le nombre de textures encore en attente.
+        À appeler depuis le thread qui possède le contexte OpenGL.
+        """
+        start = time.perf_counter()
+        while self._pending:
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
+                break
+            try:
+                item = self._upload_queue.get(block=time_budget is None)
+            except queue.Empty:
+                break
+            self._upload_decoded(*item)
+        return len(self._pending)
+
+    def _upload_decoded(self, key, result):
+        path = self._pending.pop(key)
+        if isinstance(result, Exception):
+            self._errors[key] = result
+            return
+        info = self._upload(path, key[1], *result)
+        # Datée de la frame d'envoi : pas déchargée avant d'avoir servi, au profit de textures plus anciennes
+        info.last_used = self.frame
+        self._add_resident(key, info)
+
+    def begin_frame(self):
+        """Nouvelle frame : les textures utilisées à la frame précédente redeviennent déchargeables."""
+        self.frame += 1
+
+    def use(self, path, filter_mode=GL_LINEAR):
+        """Rend la texture résidente si besoin (rechargement après éviction) et la marque utilisée."""
+        key = self._key(path, filter_mode)
+        # Décodage déjà lancé : on envoie ce qui arrive jusqu'à obtenir celle-ci
+        while key in self._pending:
+            self._upload_decoded(*self._upload_queue.get())
+        if key in self._errors:
+            raise self._errors.pop(key)
+
+        info = self.entries.get(key)
+        if info is None:
+            packed = self.pack.lookup(path) if self.pack is not None else None
+            info = self._upload(path, filter_mode, *(packed or decode_image(path)))
+            info.last_used = self.frame  # Marquée avant l'éviction qu'elle peut déclencher
+            self._add_resident(key, info)
+        else:
+            info.last_used = self.frame
+        return info
+
+    def acquire(self, path, filter_mode=GL_LINEAR):
+        info = self.use(path, filter_mode)
+        key = self._key(path, filter_mode)
+        self.ref_counts[key] = self.ref_counts.get(key, 0) + 1
+        return info
+
+    def release(self, path, filter_mode=GL_LINEAR):
+        key = self._key(path, filter_mode)
+        if key not in self.ref_counts:
+            return
+        self.ref_counts[key] -= 1
+        if self.ref_counts[key] <= 0:
+            # La texture reste résidente : _evict_over_budget la reprendra en priorité si la place manque
+            del self.ref_counts[key]
+
+    def _add_resident(self, key, info):
+        self.entries[key] = info
+        self.resident_bytes += info.size_bytes
+        if self.resident_bytes > self.budget_bytes:
+            self._evict_over_budget()
+
+    def _evict_over_budget(self):
+        """
+        Décharge des textures jusqu'à repasser sous le budget : d'abord celles que plus
+        aucun renderer ne référence, puis les moins récemment utilisées.
+        """
+        candidates = sorted(
+            (key in self.ref_counts, info.last_used, key)
+            for key, info in self.entries.items() if info.last_used < self.frame
+        )
+        for _, _, key in candidates:
+            if self.resident_bytes <= self.budget_bytes:
+                break
+            self._evict(key)
+            self.evictions += 1
+
+    def _evict(self, key):
+        info = self.entries.pop(key)
+        self.resident_bytes -= info.size_bytes
+        glDeleteTextures(int(info.texture_id))
+
+    def _upload(self, path, filter_mode, image_data, width, height):
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, image_data)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, filter_mode)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, filter_mode)
+
+        print(f"Texture chargée : {path} → ID OpenGL : {texture_id}")
+        return TextureInfo(texture_id, width, height, filter_mode)
+
+
+class TextureSet:
+    """
+    Textures d'un renderer, par nom (chemin relatif "textures/mur.png" et, si demandé,
+    nom de fichier seul). S'utilise comme l'ancien dict `textures` (méthode `get`),
+    mais une image n'est envoyée au GPU que la première fois qu'on la demande.
+    """
+    def __init__(self, filter_mode=GL_LINEAR):
+        self.filter_mode = filter_mode
+        self.paths = {}  # nom -> chemin du fichier
+        self._acquired = set()  # chemins dont ce renderer détient une référence
+        self._resolved = {}  # nom -> (clé du registre, TextureInfo) : évite normpath à chaque appel
+
+    def add_folders(self, folders, short_names=False):
+        """Indexe les images des dossiers (aucun décodage ni envoi au GPU)."""
+        for path in list_texture_files(folders):
+            self.paths[asset_name(path)] = path
+            if short_names:
+                self.paths[os.path.basename(path)] = path
+
+    def info(self, name):
+        """TextureInfo de la texture `name`, chargée au besoin (None si inconnue)."""
+        manager = get_texture_manager()
+        resolved = self._resolved.get(name)
+        if resolved is not None and manager.entries.get(resolved[0]) is resolved[1]:
+            # Chemin rapide (appelé pour chaque sprite/case à chaque frame) : texture toujours résidente
+            resolved[1].last_used = manager.frame
+            return resolved[1]
+
+        path = self.paths.get(name)
+        if path is None:
+            return None
+        try:
+            if path in self._acquired:
+                info = manager.use(path, self.filter_mode)
+            else:
+                info = manager.acquire(path, self.filter_mode)
+                self._acquired.add(path)
+        except Exception as e:
+            print(f"Erreur chargement texture : {name} → {e}")
+            del self.paths[name]  # On ne retente pas à chaque frame
+            return None
+        self._resolved[name] = (manager._key(path, self.filter_mode), info)
+        return info
+
+    def get(self, name, default=None):
+        info = self.info(name)
+        return info.texture_id if info else default
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def release(self):
+        manager = get_texture_manager()
+        for path in self._acquired:
+            manager.release(path, self.filter_mode)
+        self._acquired = set()
+        self._resolved = {}
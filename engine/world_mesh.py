@@ -0,0 +1,151 @@
+# engine/world_mesh.py
+
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+
+# Un sommet = position (x, y, z) + UV (u, v), en float32
+VERTEX_SIZE = 5
+VERTEX_STRIDE = VERTEX_SIZE * 4
+POSITION_OFFSET = ctypes.c_void_p(0)
+UV_OFFSET = ctypes.c_void_p(12)
+
+
+class WorldMesh:
+    """
+    Maillage statique du niveau (murs, plafonds et sols) stocké dans un VBO unique.
+    Il est construit une seule fois au chargement de la carte, trié par chunk puis
+    par texture : chaque chunk connaît sa boîte englobante et ses plages de sommets.
+    À chaque frame, seuls les chunks dans le frustum de la caméra sont dessinés,
+    et les plages contiguës de même texture sont fusionnées en un seul glDrawArrays.
+    Avec un atlas, les faces d'une seule case dont la texture y figure utilisent la
+    clé de texture None et se dessinent avec un unique glBindTexture. Les faces
+    fusionnées (UV 0..W x 0..H) gardent leur propre texture : une tuile de l'atlas
+    ne peut pas se répéter via GL_REPEAT, et les redécouper en quads unitaires
+    annulerait la fusion.
+    """
+    def __init__(self):
+        self.vbo = None
+        self.chunks = []  # Liste de (index_chunk, bounds, [(nom_texture ou None, premier_sommet, nombre_de_sommets)])
+        self.vertex_count = 0
+        self.atlas = None
+
+        # Compteurs de la dernière frame
+        self.chunks_drawn = 0
+        self.chunks_culled = 0
+        self.chunks_occluded = 0
+
+    def build(self, game_map, atlas=None):
+        """Génère le buffer GPU à partir de la grille de la carte."""
+        self.release()
+        self.atlas = atlas if atlas is not None and atlas.texture_id is not None else None
+
+        # Tampons de faces (N quads) précalculés par la carte, éventuellement lus depuis la carte compilée
+        geometry = game_map.get_geometry_arrays()
+        vertices, uvs = geometry["vertices"], geometry["uvs"]
+        texture_ids, face_chunks = geometry["texture"], geometry["chunk"]
+        texture_names = list(geometry["textures"])
+
+        if self.atlas is not None and len(texture_ids):
+            single = (np.rint(uvs[:, 2, 0]) <= 1) & (np.rint(uvs[:, 2, 1]) <= 1)
+            in_atlas = np.array([name in self.atlas.uv_rects for name in texture_names], dtype=bool)[texture_ids] & single
+            if in_atlas.any():
+                rects = np.array([self.atlas.uv_rects.get(name, (0, 0, 1, 1)) for name in texture_names], dtype=np.float32)
+                rects = rects[texture_ids[in_atlas]][:, None, :]
+                uvs = uvs.copy()
+                uvs[in_atlas] = rects[:, :, :2] + uvs[in_atlas] * (rects[:, :, 2:] - rects[:, :, :2])
+                # Toutes les faces unitaires de l'atlas partagent la clé de texture None
+                texture_names.append(None)
+                texture_ids = np.where(in_atlas, len(texture_names) - 1, texture_ids)
+
+        # Tri par chunk (cx, cy) puis par texture : chaque couple devient une plage contiguë du VBO
+        order = np.lexsort((texture_ids, face_chunks[:, 1], face_chunks[:, 0]))
+        data = np.concatenate([vertices[order], uvs[order]], axis=2).reshape(-1, VERTEX_SIZE).astype(np.float32)
+        keys = np.column_stack((face_chunks[order], texture_ids[order]))
+        changes = np.ones(len(keys), dtype=bool)
+        changes[1:] = (keys[1:] != keys[:-1]).any(axis=1)
+        starts = np.flatnonzero(changes)
+        ends = np.r_[starts[1:], len(keys)]
+
+        current_key, ranges = None, None
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            cx, cy, texture_id = keys[start].tolist()
+            if (cx, cy) != current_key:
+                current_key, ranges = (cx, cy), []
+                chunk = game_map.chunks[current_key]
+                self.chunks.append((chunk["index"], chunk["bounds"], ranges))
+            ranges.append((texture_names[texture_id], start * 4, (end - start) * 4))
+        self.vertex_count = len(data)
+
+        if len(data):
+            self.vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        for category, (before, after) in game_map.geometry_stats.items():
+            print(f"Géométrie {game_map.current_map_path} [{category}] : {before} faces -> {after} faces")
+        print(f"Maillage du niveau construit : {self.vertex_count} sommets, {len(self.chunks)} chunk(s)")
+
+    def draw(self, textures, frustum=None, visible_chunks=None):
+        """
+        Dessine les chunks visibles. `textures` associe nom de texture -> ID OpenGL,
+        `frustum` (optionnel) sert à éliminer les chunks hors du champ de vision et
+        `visible_chunks` (optionnel, issu du PVS) les chunks masqués par les murs.
+        """
+        self.chunks_drawn = 0
+        self.chunks_culled = 0
+        self.chunks_occluded = 0
+        if self.vbo is None:
+            return
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, POSITION_OFFSET)
+        glTexCoordPointer(2, GL_FLOAT, VERTEX_STRIDE, UV_OFFSET)
+
+        bound_texture = None
+        pending_first, pending_count = 0, 0
+
+        for index, bounds, ranges in self.chunks:
+            if visible_chunks is not None and not visible_chunks[index]:
+                self.chunks_occluded += 1
+                continue
+            if frustum is not None and not frustum.intersects_box(bounds):
+                self.chunks_culled += 1
+                continue
+            self.chunks_drawn += 1
+
+            for texture_name, first, count in ranges:
+                texture_id = self.atlas.texture_id if texture_name is None else textures.get(texture_name)
+                if texture_id is None:
+                    continue
+
+                # Plage contiguë avec la précédente et même texture : on l'étend
+                if texture_id == bound_texture and first == pending_first + pending_count:
+                    pending_count += count
+                    continue
+
+                if pending_count:
+                    glDrawArrays(GL_QUADS, pending_first, pending_count)
+                if texture_id != bound_texture:
+                    glBindTexture(GL_TEXTURE_2D, texture_id)
+                    bound_texture = texture_id
+                pending_first, pending_count = first, count
+
+        if pending_count:
+            glDrawArrays(GL_QUADS, pending_first, pending_count)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def release(self):
+        """Libère le VBO (à appeler avant de reconstruire ou de changer de carte)."""
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+        self.vbo = None
+        self.chunks = []
+        self.vertex_count = 0
+        self.atlas = None
@@ -21,11 +21,14 @@ class GameStateManager:
 
     def pop_state(self):
         if self.states:
-            self.states.pop()
+            self.states.pop().exit()
 
     def switch_state(self, state):
+        # Les anciens états rendent leurs références, mais leurs textures restent
+        # résidentes (le registre ne les décharge que si le budget mémoire est dépassé) :
+        # le nouvel état réutilise celles qu'il partage avec eux sans rechargement.
         while self.states:
-            self.states.pop()
+            self.states.pop().exit()
         self.states.append(state)
 
     def get_active_state(self):
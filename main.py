@@ -3,9 +3,10 @@
 import pygame
 import sys
 import traceback
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, TARGET_FPS
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, TARGET_FPS, TEXTURE_UPLOAD_BUDGET_MS
 from game_state_manager import GameStateManager
 from states.menu_state import MenuState # On importe le nouvel état du menu
+from engine.texture_manager import get_texture_manager
 
 def main():
     try:
@@ -27,10 +28,14 @@ def main():
         # Elle tournera tant qu'il y aura au moins un état dans la pile.
         while manager.get_active_state() is not None:
             delta_time = clock.tick(TARGET_FPS) / 1000.0
+            get_texture_manager().begin_frame()
             
             # On délègue les mises à jour et le rendu à l'état actif.
             manager.update(delta_time)
             manager.render(screen)
+
+            # Textures décodées en tâche de fond : envoi au GPU dans la limite du budget de la frame
+            get_texture_manager().process_uploads(TEXTURE_UPLOAD_BUDGET_MS / 1000.0)
             
     except Exception as e:
         print(f"Une erreur est survenue : {e}", file=sys.stderr)
@@ -1,9 +1,19 @@
 from objects.pnj import PNJ
 from ai.behavior import decide_action
+from ai.foe_batch import BatchField
 import random
 from math import floor
 
 class Foe(PNJ):
+    # Vues sur les tableaux du FoeBatch quand l'IA groupée est active (voir ai/foe_batch.py)
+    position = BatchField()
+    health = BatchField()
+    state = BatchField()
+    dmg_timer = BatchField()
+    attack_timer = BatchField()
+    _batch = None
+    _slot = None
+
     def __init__(self, name, position=(0, 0, 0), obj_id=None):
         super().__init__(name=name, position=position, obj_id=obj_id)
         self.patrol_points = [position]
@@ -26,7 +36,7 @@ class Foe(PNJ):
             self._patrol(delta_time, game_map)
 
         elif action == "chase":
-            self._move_toward(player.position, delta_time, game_map)
+            self._move_toward(self._chase_target(player, game_map), delta_time, game_map)
 
         elif action == "attack":
             self.attack_timer += delta_time
@@ -46,6 +56,17 @@ class Foe(PNJ):
 
 
 
+    def _chase_target(self, player, game_map):
+        """
+        Point visé en poursuite : le centre de la case suivante donnée par le champ de flux
+        de la carte (contourne les murs), ou le joueur en ligne droite s'il est dans la même
+        case ou hors de portée du champ.
+        """
+        next_cell = game_map.flow_field.next_cell(int(self.position[0]), int(-self.position[2]))
+        if next_cell is None:
+            return player.position
+        return (next_cell[0] + 0.5, self.position[1], -next_cell[1] - 0.5)
+
     def _move_toward(self, target_pos, delta_time, game_map):
         dx = target_pos[0] - self.position[0]
         dz = target_pos[2] - self.position[2]
@@ -62,15 +83,15 @@ class Foe(PNJ):
 
         cell_x = int(next_x + (offset if dir_x > 0 else -offset))
         cell_z = int(-self.position[2])
-        if 0 <= cell_z < len(game_map.grid) and 0 <= cell_x < len(game_map.grid[0]):
-            if game_map.grid[cell_z][cell_x] in game_map.floor_textures:
-                self.position = (next_x, self.position[1], self.position[2])
+        if game_map.is_walkable(cell_x, cell_z):
+            self.position = (next_x, self.position[1], self.position[2])
 
         cell_x = int(self.position[0])
         cell_z = int(-next_z + (offset if dir_z < 0 else -offset))
-        if 0 <= cell_z < len(game_map.grid) and 0 <= cell_x < len(game_map.grid[0]):
-            if game_map.grid[cell_z][cell_x] in game_map.floor_textures:
-                self.position = (self.position[0], self.position[1], next_z)
+        if game_map.is_walkable(cell_x, cell_z):
+            self.position = (self.position[0], self.position[1], next_z)
+
+        game_map.pnj_hash.move(self)
 
     def _attack(self, player, renderer):
         if self.health > 0 and player.health > 0:
@@ -100,33 +121,11 @@ class Foe(PNJ):
         self._move_toward(target, delta_time, game_map)
 
     def has_line_of_sight(self, target, game_map):
-
-        x0 = int(self.position[0])
-        y0 = int(-self.position[2])  # axe Z inversé
-
-        x1 = int(target.position[0])
-        y1 = int(-target.position[2])
-
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        x, y = x0, y0
-
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-
-        err = dx - dy
-
-        while x != x1 or y != y1:
-            if 0 <= y < len(game_map.grid) and 0 <= x < len(game_map.grid[0]):
-                cell = game_map.grid[y][x]
-                if cell not in game_map.floor_textures:
-                    return False
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x += sx
-            if e2 < dx:
-                err += dx
-                y += sy
-
-        return True
+        # axe Z inversé : la ligne y de la grille correspond à -z
+        x, y = int(self.position[0]), int(-self.position[2])
+        target_x, target_y = int(target.position[0]), int(-target.position[2])
+        # Cible dans la case du champ de vision du joueur : l'ennemi la voit s'il est vu
+        field_of_view = game_map.field_of_view
+        if field_of_view.is_current(target_x, target_y):
+            return field_of_view.is_visible(x, y)
+        return game_map.has_line_of_sight(x, y, target_x, target_y)
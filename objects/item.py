@@ -1,6 +1,10 @@
 # objects/item.py
 
 from objects.game_object import GameObject
+from config import WEAPON_CONFIG
+
+# Distance (en cases) à laquelle le joueur ramasse un objet
+PICKUP_RADIUS = 0.8
 
 class Item(GameObject):
     """
@@ -44,6 +48,7 @@ class Item(GameObject):
                 size = 0.2
             elif self.item_type == "weapon":
                 name = self.weapon_attrs.get("name", "unknown")
+                name = WEAPON_CONFIG.get(name, {}).get("sprite", name)
                 sprite_name = f"sprites/weapon_{name}.png"
                 size = 0.3
 
@@ -85,7 +90,7 @@ class Item(GameObject):
             player.inventory_items.remove(self)
         player.item_index = max(0, player.item_index - 1)
 
-    def _is_near(self, position, threshold=0.8):
+    def _is_near(self, position, threshold=PICKUP_RADIUS):
         """Vérifie si une position est proche de l'item."""
         dx = self.position[0] - position[0]
         dz = self.position[2] - position[2]
@@ -1,11 +1,15 @@
 # objects/player.py
 
 import math
+import numpy as np
 import pygame
 from objects.game_object import GameObject
 from objects.weapon import Weapon
 from config import PLAYER_SPEED, MOUSE_SENSITIVITY, WEAPON_CONFIG, OVERWORLD_PLAYER_SPEED
 
+# Ouverture (degrés) du cône dans lequel une arme peut toucher
+FIRE_CONE_ANGLE = 60.0
+
 class Player(GameObject):
     def __init__(self, position=(1.0, 0.0, 1.0)):
         super().__init__(position)
@@ -30,7 +34,7 @@ class Player(GameObject):
             "shell": 10
         }
 
-    def _is_in_view(self, target, fov=60.0):
+    def _is_in_view(self, target, fov=FIRE_CONE_ANGLE):
         dx = target.position[0] - self.position[0]
         dz = target.position[2] - self.position[2]
         angle_to_target = (math.degrees(math.atan2(-dx, -dz))) % 360
@@ -40,28 +44,10 @@ class Player(GameObject):
         return in_view
 
     def _has_line_of_sight(self, target, game_map):
-        x0 = int(self.position[0])
-        y0 = int(-self.position[2])
-        x1 = int(target.position[0])
-        y1 = int(-target.position[2])
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        x, y = x0, y0
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx - dy
-        while x != x1 or y != y1:
-            if 0 <= y < len(game_map.grid) and 0 <= x < len(game_map.grid[0]):
-                if game_map.grid[y][x] not in game_map.floor_textures:
-                    return False
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x += sx
-            if e2 < dx:
-                err += dx
-                y += sy
-        return True
+        return game_map.has_line_of_sight(
+            int(self.position[0]), int(-self.position[2]),
+            int(target.position[0]), int(-target.position[2])
+        )
 
     def update(self, movement_vector, mouse_delta, delta_time, game_map, tile_size=None):
         """
@@ -106,13 +92,13 @@ class Player(GameObject):
         next_x = self.position[0] + dx
         cell_x = int(next_x + (offset if dx > 0 else -offset))
         cell_z = int(-self.position[2])
-        if 0 <= cell_z < len(game_map.grid) and 0 <= cell_x < len(game_map.grid[0]) and game_map.grid[cell_z][cell_x] in game_map.floor_textures:
+        if game_map.is_walkable(cell_x, cell_z):
             self.position[0] = next_x
 
         next_z = self.position[2] + dz
         cell_x = int(self.position[0])
         cell_z = int(-next_z + (offset if dz < 0 else -offset))
-        if 0 <= cell_z < len(game_map.grid) and 0 <= cell_x < len(game_map.grid[0]) and game_map.grid[cell_z][cell_x] in game_map.floor_textures:
+        if game_map.is_walkable(cell_x, cell_z):
             self.position[2] = next_z
 
     def _update_2d_movement(self, movement_vector, delta_time, game_map, tile_size):
@@ -199,37 +185,87 @@ class Player(GameObject):
     def draw(self, renderer):
         pass
 
-    def fire(self, pnjs, game_map):
+    def fire(self, game_map):
         if self.health <= 0:
             return
 
         shot_fired = self.active_weapon.perform_attack()
 
-        if shot_fired:
+        if shot_fired and self.active_weapon.weapon_type == "ranged":
+            self._fire_hitscan(game_map)
+
+        elif shot_fired and self.active_weapon.weapon_type == "spread":
+            self._fire_spread(game_map)
+
+        elif shot_fired:
+            # Seuls les PNJ des cases à portée de l'arme sont examinés (hachage spatial de la carte)
+            in_cone = game_map.pnj_hash.query_cone(
+                self.position[0], self.position[2], self.rotation_y, FIRE_CONE_ANGLE, self.active_weapon.range
+            )
+            candidates = [pnj for pnj in in_cone if pnj.health > 0]
+            cell = int(self.position[0]), int(-self.position[2])
+            target_xs = [int(pnj.position[0]) for pnj in candidates]
+            target_ys = [int(-pnj.position[2]) for pnj in candidates]
+            if not candidates:
+                visible = []
+            elif game_map.field_of_view.is_current(*cell):
+                # Champ de vision à jour : simple lecture pour chaque cible
+                visible = game_map.field_of_view.are_visible(target_xs, target_ys)
+            else:
+                # Lignes de vue de toutes les cibles possibles en une seule requête (cache de la carte)
+                visible = game_map.lines_of_sight(cell[0], cell[1], target_xs, target_ys)
+
             targets = []
-            for pnj in pnjs:
-                if hasattr(pnj, "health") and pnj.health > 0:
-                    if self._is_in_view(pnj) and self._has_line_of_sight(pnj, game_map):
-                        dx = pnj.position[0] - self.position[0]
-                        dz = pnj.position[2] - self.position[2]
-                        distance = (dx**2 + dz**2) ** 0.5
-                        targets.append((distance, pnj))
+            for pnj, in_sight in zip(candidates, visible):
+                if in_sight:
+                    dx = pnj.position[0] - self.position[0]
+                    dz = pnj.position[2] - self.position[2]
+                    distance = (dx**2 + dz**2) ** 0.5
+                    targets.append((distance, pnj))
             
             self._apply_damage_to_targets(targets)
 
+    def _aim_direction(self):
+        """Direction horizontale unitaire (dx, dz) visée par la caméra."""
+        rad = math.radians(-self.rotation_y)
+        return math.sin(rad), -math.cos(rad)
+
+    def _fire_hitscan(self, game_map):
+        """Arme à distance : seul le PNJ sous le viseur, devant le premier mur, est touché."""
+        dir_x, dir_z = self._aim_direction()
+        hit = game_map.hitscan(
+            self.position[0], self.position[1], self.position[2], dir_x, dir_z, self.active_weapon.range
+        )
+        if hit is not None:
+            hit[0].take_damage(self.active_weapon.power)
+
+    def _fire_spread(self, game_map):
+        """
+        Arme à plombs : tous les plombs, tirés au hasard dans le cône de l'arme, sont
+        résolus par un seul lancer groupé (GameMap.hitscan_batch). Les dégâts d'un plomb
+        baissent avec la distance (falloff) et sont cumulés par PNJ touché.
+        """
+        weapon = self.active_weapon
+        half_spread = weapon.spread / 2
+        angles = np.radians(-(self.rotation_y + np.random.uniform(-half_spread, half_spread, weapon.pellets)))
+        pnjs, index, distances = game_map.hitscan_batch(
+            self.position[0], self.position[1], self.position[2], np.sin(angles), -np.cos(angles), weapon.range
+        )
+        hit = index >= 0
+        if not hit.any():
+            return
+        damage = weapon.power * np.clip(1.0 - weapon.falloff * distances[hit] / weapon.range, 0.0, 1.0)
+        totals = np.bincount(index[hit], weights=damage, minlength=len(pnjs))
+        for i in np.flatnonzero(totals).tolist():
+            pnjs[i].take_damage(round(float(totals[i]), 1))
+
     def _apply_damage_to_targets(self, targets):
         weapon = self.active_weapon
 
         if not targets:
             return
 
-        if weapon.weapon_type == "ranged":
-            closest_target = min(targets, key=lambda t: t[0])
-            distance_to_target, pnj_to_damage = closest_target
-            if distance_to_target <= weapon.range:
-                pnj_to_damage.take_damage(weapon.power)
-
-        elif weapon.weapon_type == "melee":
+        if weapon.weapon_type == "melee":
             
             if weapon.melee_behavior == "single_target":
                 closest_target = min(targets, key=lambda t: t[0])
@@ -6,13 +6,18 @@ class Weapon:
     Cette classe est conçue pour être flexible et gérer différents types d'armes
     (mêlée, à distance, etc.) avec des modes de tir variés.
     """
-    def __init__(self, name="fist", weapon_type="melee", power=10, range=1.5, rpm=300, mag_size=10, ammo_type="none", melee_behavior="single_target"):
+    def __init__(self, name="fist", weapon_type="melee", power=10, range=1.5, rpm=300, mag_size=10, ammo_type="none", melee_behavior="single_target",
+                 pellets=1, spread=0.0, falloff=0.0, sprite=None):
         """
         Initialise une nouvelle arme.
         ...
         Args:
             # ... (autres arguments)
             melee_behavior (str): Comportement pour les armes de mêlée ('single_target' ou 'area_effect').
+            pellets (int): Nombre de plombs par tir (armes 'spread').
+            spread (float): Ouverture (degrés) du cône dans lequel partent les plombs.
+            falloff (float): Perte de dégâts d'un plomb à portée maximale (0 = aucune, 1 = totale).
+            sprite (str): Nom des visuels de l'arme (icône, vue à la première personne) ; par défaut `name`.
         """
         self.name = name
         self.weapon_type = weapon_type
@@ -25,6 +30,10 @@ class Weapon:
         self.ammo_loaded = mag_size
         self.ammo_type = ammo_type
         self.melee_behavior = melee_behavior # <-- On stocke le nouvel attribut
+        self.pellets = pellets
+        self.spread = spread
+        self.falloff = falloff
+        self.sprite = sprite or name
 
     def set_state(self, new_state):
         """
@@ -22,3 +22,10 @@ class BaseState:
         Doit être redéfinie dans les classes filles.
         """
         pass
+
+    def exit(self):
+        """
+        Appelée quand l'état est retiré de la pile.
+        Les états qui possèdent des ressources (textures, buffers) les libèrent ici.
+        """
+        pass
@@ -6,6 +6,7 @@ from OpenGL.GL import *
 
 from states.base_state import BaseState
 from ui.button import Button
+from engine.text_renderer import get_text_renderer
 from config import SCREEN_WIDTH, SCREEN_HEIGHT
 
 # Imports pour le "type hinting" afin d'éviter les imports circulaires
@@ -26,12 +27,8 @@ class GameOverState(BaseState):
         pygame.mouse.set_visible(True)
         pygame.event.set_grab(False)
         
-        try:
-            self.title_font = pygame.font.Font("assets/ui/PressStart2P-Regular.ttf", 48)
-            self.font = pygame.font.Font("assets/ui/PressStart2P-Regular.ttf", 24)
-        except pygame.error:
-            self.title_font = pygame.font.Font(None, 70)
-            self.font = pygame.font.Font(None, 40)
+        self.title_font = get_text_renderer(48)
+        self.font = get_text_renderer(24)
 
         # Création des boutons
         self.buttons = []
@@ -114,24 +111,7 @@ class GameOverState(BaseState):
         return self._draw_text(text, x, y, self.font, dry_run)
         
     def _draw_text(self, text, x, y, font, dry_run=False):
-        """Méthode de rendu de texte générique."""
-        surface = font.render(text, True, (255, 255, 255))
-        width, height = surface.get_size()
-        if dry_run: return width, height
-        texture_data = pygame.image.tostring(surface, "RGBA", True)
-        texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glColor4f(1.0, 1.0, 1.0, 1.0)
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 1); glVertex2f(x, y)
-        glTexCoord2f(1, 1); glVertex2f(x + width, y)
-        glTexCoord2f(1, 0); glVertex2f(x + width, y + height)
-        glTexCoord2f(0, 0); glVertex2f(x, y + height)
-        glEnd()
-        
-        # --- CORRECTION ---
-        # On s'assure de passer un entier Python standard à la fonction de suppression.
-        glDeleteTextures(int(texture_id))
+        """Méthode de rendu de texte générique (`font` est un TextRenderer partagé)."""
+        if dry_run:
+            return font.measure(text)
+        font.draw(text, x, y)
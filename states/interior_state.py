@@ -72,3 +72,6 @@ class InteriorState(BaseState):
         Délègue le rendu graphique au moteur de jeu.
         """
         self.game_engine.render()
+
+    def exit(self):
+        self.game_engine.release()
@@ -7,6 +7,7 @@ from OpenGL.GL import *
 from states.base_state import BaseState
 from states.interior_state import InteriorState
 from states.overworld_state import OverworldState
+from engine.text_renderer import get_text_renderer
 from config import SCREEN_WIDTH, SCREEN_HEIGHT
 
 class MapSelectionState(BaseState):
@@ -16,10 +17,7 @@ class MapSelectionState(BaseState):
         self.maps_folder = "assets/maps"
         self.map_files = self._get_map_files()
         self.selected_map_index = 0
-        try:
-            self.font = pygame.font.Font("assets/ui/PressStart2P-Regular.ttf", 20)
-        except pygame.error:
-            self.font = pygame.font.Font(None, 32)
+        self.text_renderer = get_text_renderer(20)
         
     def _get_map_files(self):
         files = [f for f in os.listdir(self.maps_folder) if f.endswith('.json')]
@@ -61,29 +59,9 @@ class MapSelectionState(BaseState):
         pygame.display.flip()
 
     def _draw_text(self, text, x, y, color=(255, 255, 255), dry_run=False):
-        surface = self.font.render(text, True, color)
-        width, height = surface.get_size()
-        if dry_run: return width, height
-
-        texture_data = pygame.image.tostring(surface, "RGBA", True)
-        texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glColor4f(1.0, 1.0, 1.0, 1.0)
-        
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 1); glVertex2f(x, y)
-        glTexCoord2f(1, 1); glVertex2f(x + width, y)
-        glTexCoord2f(1, 0); glVertex2f(x + width, y + height)
-        glTexCoord2f(0, 0); glVertex2f(x, y + height)
-        glEnd()
-        
-        glDeleteTextures(int(texture_id))
+        if dry_run:
+            return self.text_renderer.measure(text)
+        self.text_renderer.draw(text, x, y, color)
 
     def start_game_with_map(self):
         from gameplay.game_session import GameSession
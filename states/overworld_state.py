@@ -4,11 +4,12 @@ import pygame
 import sys
 from OpenGL.GL import *
 from math import sqrt
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, OVERWORLD_PLAYER_SPEED
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, OVERWORLD_PLAYER_SPEED, TEXTURES_PATH
 from states.base_state import BaseState
 from states.menu_state import MenuState
 from states.interior_state import InteriorState
 from engine.renderer_2d import Renderer2D
+from engine.texture_manager import get_texture_manager, list_texture_files
 from engine.input_manager import InputManager
 from world.map import GameMap
 from objects.player import Player
@@ -31,7 +32,7 @@ class OverworldState(BaseState):
             # CORRECTION : On déplace le joueur vers le bas (Sud) pour ne pas être SUR la porte
             start_y += 1.5 
         else:
-            start_x = len(self.game_map.grid[0]) / 2
+            start_x = self.game_map.width / 2
             start_y = 5.0
 
         self.player = Player(position=[start_x, start_y, 0.0])
@@ -41,6 +42,11 @@ class OverworldState(BaseState):
         if self.manager.game_session:
             self.manager.game_session.apply_to_player(self.player)
 
+        # Les textures murs/sols des intérieurs se décodent pendant l'exploration
+        # (envoyées au GPU par petites quantités à chaque frame par la boucle principale).
+        # Les sprites, bien plus nombreux, restent chargés à la demande.
+        get_texture_manager().prefetch(list_texture_files([TEXTURES_PATH]), GL_LINEAR)
+
         pygame.mouse.set_visible(False)
         pygame.event.set_grab(True)
 
@@ -73,7 +79,7 @@ class OverworldState(BaseState):
         self.player.update(movement_vector, (0,0), delta_time, self.game_map, self.renderer_2d.tile_size)
 
         # --- 3. MISE À JOUR DE LA CAMÉRA ---
-        map_size = (len(self.game_map.grid[0]), len(self.game_map.grid))
+        map_size = (self.game_map.width, self.game_map.height)
         self.renderer_2d.update_camera((self.player.position[0], self.player.position[1]), map_size)
 
     def _check_for_transitions(self):
@@ -155,3 +161,6 @@ class OverworldState(BaseState):
         )
 
         pygame.display.flip()
+
+    def exit(self):
+        self.renderer_2d.release()
@@ -6,6 +6,7 @@ from OpenGL.GL import *
 
 from states.base_state import BaseState
 from ui.button import Button
+from engine.text_renderer import get_text_renderer
 from config import SCREEN_WIDTH, SCREEN_HEIGHT
 
 # Pour éviter une boucle d'importation, on ne l'importe que pour le "type hinting"
@@ -27,10 +28,7 @@ class PauseState(BaseState):
         pygame.mouse.set_visible(True)
         pygame.event.set_grab(False)
         
-        try:
-            self.font = pygame.font.Font("assets/ui/PressStart2P-Regular.ttf", 24)
-        except pygame.error:
-            self.font = pygame.font.Font(None, 40)
+        self.text_renderer = get_text_renderer(24)
 
         # Création des boutons
         self.buttons = []
@@ -133,21 +131,7 @@ class PauseState(BaseState):
         pygame.display.flip()
         
     def _draw_text(self, text, x, y, dry_run=False):
-        """Méthode de rendu de texte (copiée de MenuState pour l'instant)."""
-        surface = self.font.render(text, True, (255, 255, 255))
-        width, height = surface.get_size()
-        if dry_run: return width, height
-        texture_data = pygame.image.tostring(surface, "RGBA", True)
-        texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        glColor4f(1.0, 1.0, 1.0, 1.0)
-        glBegin(GL_QUADS)
-        glTexCoord2f(0, 1); glVertex2f(x, y)
-        glTexCoord2f(1, 1); glVertex2f(x + width, y)
-        glTexCoord2f(1, 0); glVertex2f(x + width, y + height)
-        glTexCoord2f(0, 0); glVertex2f(x, y + height)
-        glEnd()
-        glDeleteTextures(texture_id)
+        """Méthode de rendu de texte (atlas de glyphes partagé avec le menu et le HUD)."""
+        if dry_run:
+            return self.text_renderer.measure(text)
+        self.text_renderer.draw(text, x, y)
@@ -0,0 +1,189 @@
+# world/fov.py
+
+import numpy as np
+from config import FOV_RADIUS
+
+# Transformations (xx, xy, yx, yy) du repère d'un octant vers la grille : les 8 octants couvrent le tour complet
+OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+# Points de vue échantillonnés dans la case d'origine (décalages depuis le centre, en fraction de case) :
+# les quatre coins, comme les points extrêmes du PVS, pour couvrir toute position du joueur dans sa case
+FOV_SAMPLE_OFFSETS = ((-0.45, -0.45), (0.45, -0.45), (-0.45, 0.45), (0.45, 0.45))
+
+
+def _cast_octant(blocked, lit, width, height, cx, cy, ox, oy, radius, xx, xy, yx, yy):
+    """
+    Ombrage récursif (recursive shadowcasting) sur un octant : les rangées sont balayées
+    en s'éloignant du point de vue, et chaque suite de cases opaques découpe l'intervalle
+    de pentes encore éclairé (la partie visible au-delà est traitée par récursion).
+    Le point de vue est décalé de (ox, oy) par rapport au centre de la case (cx, cy) :
+    les pentes sont prises aux quatre coins de chaque case.
+    `blocked` et `lit` sont des tableaux plats (indice y * width + x).
+    """
+    radius_squared = radius * radius
+    # Décalage du point de vue dans le repère de l'octant (matrice orthogonale : transposée)
+    vx = xx * ox + yx * oy
+    vy = xy * ox + yy * oy
+
+    def cast(row, start, end):
+        if start < end:
+            return
+        for j in range(row, radius + 1):
+            # Bords proche et lointain de la rangée, toujours devant le point de vue (y < 0) :
+            # la pente x / y d'un coin est extrême sur le bord proche si x est du bon signe
+            inv_near = 1.0 / (-j + 0.5 - vy)
+            inv_far = 1.0 / (-j - 0.5 - vy)
+            row_squared = j * j
+            in_shadow = False
+            new_start = start
+            # Une case de plus de chaque côté : avec un point de vue décentré, les cases
+            # voisines de la diagonale et de l'axe peuvent déborder dans l'octant
+            for dx in range(-j - 1, 2):
+                left = dx - 0.5 - vx
+                right = left + 1.0
+                l_slope = left * (inv_near if left < 0 else inv_far)
+                r_slope = right * (inv_near if right >= 0 else inv_far)
+                if start < r_slope:
+                    continue
+                if end > l_slope:
+                    break
+
+                x = cx + dx * xx - j * xy
+                y = cy + dx * yx - j * yy
+                inside = 0 <= x < width and 0 <= y < height
+                if inside and dx * dx + row_squared <= radius_squared:
+                    lit[y * width + x] = 1
+                wall = not inside or blocked[y * width + x]  # Hors de la carte : la vue s'arrête
+
+                if in_shadow:
+                    if wall:
+                        new_start = r_slope
+                        continue
+                    in_shadow = False
+                    start = new_start
+                elif wall and j < radius:
+                    in_shadow = True
+                    cast(j + 1, start, l_slope)
+                    new_start = r_slope
+            if in_shadow:
+                break
+
+    cast(1, 1.0, 0.0)
+
+
+def compute_fov(opaque, origin_x, origin_y, radius, offsets=FOV_SAMPLE_OFFSETS):
+    """
+    Champ de vision depuis la case (origin_x, origin_y) sur la grille d'opacité `opaque` (H, W) :
+    union des ombrages récursifs depuis chaque point de vue `offsets` de la case, limitée
+    à `radius` cases. Les cases opaques vues (murs) sont incluses.
+    Retourne un tableau booléen (H, W).
+    """
+    height, width = opaque.shape
+    lit = bytearray(width * height)
+    if 0 <= origin_x < width and 0 <= origin_y < height:
+        blocked = opaque.ravel().tolist()
+        lit[origin_y * width + origin_x] = 1
+        for ox, oy in offsets:
+            for octant in OCTANTS:
+                _cast_octant(blocked, lit, width, height, origin_x, origin_y, ox, oy, radius, *octant)
+    return np.frombuffer(lit, dtype=bool).reshape(height, width)
+
+
+class FieldOfView:
+    """
+    Ce que le joueur voit depuis sa case, partagé par tous les systèmes qui en ont besoin
+    (tri des sprites, attaques des ennemis, mini-carte) : un masque de cases calculé par
+    ombrage récursif sur une fenêtre de `radius` cases autour du joueur, recalculé
+    seulement quand le joueur change de case ou que la carte est rechargée. Les lectures
+    sont ensuite en O(1). La vue est arrêtée par GameMap.sight_blocking (toute case qui
+    n'est pas un sol), la même règle que les lignes de vue qu'il remplace.
+    `explored` cumule, sur toute la carte, les cases déjà vues (brouillard de guerre).
+    """
+    def __init__(self, game_map, radius=FOV_RADIUS):
+        self.game_map = game_map
+        self.radius = radius
+        self.center = None
+        self.origin = (0, 0)  # Coin (x, y) de la fenêtre dans la grille
+        self.visible = np.zeros((0, 0), dtype=bool)  # Cases vues, dans la fenêtre
+        self.nearby = np.zeros((0, 0), dtype=bool)   # Cases vues ou voisines d'une case vue
+        self.explored = np.zeros((0, 0), dtype=bool) # Cases déjà vues, sur toute la carte
+        self.revision = 0  # Incrémenté à chaque recalcul
+        self._blocking = None  # Masque utilisé au dernier calcul (détecte un rechargement de carte)
+
+    def update(self, x, y):
+        """Recalcule le champ de vision si le joueur a changé de case. Retourne True s'il a été recalculé."""
+        if self.is_current(x, y):
+            return False
+        self.center = (x, y)
+        self._blocking = self.game_map.sight_blocking
+        self._compute()
+        self.revision += 1
+        return True
+
+    def is_current(self, x, y):
+        """Vrai si le champ de vision est à jour pour un joueur dans la case (x, y)."""
+        return (x, y) == self.center and self._blocking is self.game_map.sight_blocking
+
+    def _compute(self):
+        blocking = self._blocking
+        height, width = blocking.shape
+        if self.explored.shape != blocking.shape:
+            self.explored = np.zeros(blocking.shape, dtype=bool)
+
+        # Une case de marge autour du rayon : les bords de la fenêtre comptent comme murs
+        x, y = self.center
+        margin = self.radius + 1
+        x0, y0 = min(max(x - margin, 0), width), min(max(y - margin, 0), height)
+        x1, y1 = max(min(x + margin + 1, width), x0), max(min(y + margin + 1, height), y0)
+        self.origin = (x0, y0)
+        visible = compute_fov(blocking[y0:y1, x0:x1], x - x0, y - y0, self.radius)
+        self.visible = visible
+
+        # Marge d'une case pour les tests de rendu (un sprite déborde de sa case)
+        nearby = visible.copy()
+        nearby[1:] |= visible[:-1]
+        nearby[:-1] |= visible[1:]
+        nearby[:, 1:] |= nearby[:, :-1].copy()
+        nearby[:, :-1] |= nearby[:, 1:].copy()
+        self.nearby = nearby
+
+        self.explored[y0:y1, x0:x1] |= visible
+
+    def bounds(self):
+        """Fenêtre (x0, y0, x1, y1) du dernier calcul, bornes hautes exclues."""
+        rows, cols = self.visible.shape
+        return self.origin[0], self.origin[1], self.origin[0] + cols, self.origin[1] + rows
+
+    def is_visible(self, x, y):
+        """Vrai si le joueur voit la case (x, y)."""
+        x -= self.origin[0]
+        y -= self.origin[1]
+        rows, cols = self.visible.shape
+        return 0 <= x < cols and 0 <= y < rows and bool(self.visible[y, x])
+
+    def are_visible(self, xs, ys):
+        """Version vectorisée de is_visible pour des tableaux de cases."""
+        xs = np.asarray(xs, dtype=np.int64) - self.origin[0]
+        ys = np.asarray(ys, dtype=np.int64) - self.origin[1]
+        rows, cols = self.visible.shape
+        inside = (xs >= 0) & (xs < cols) & (ys >= 0) & (ys < rows)
+        result = np.zeros(inside.shape, dtype=bool)
+        result[inside] = self.visible[ys[inside], xs[inside]]
+        return result
+
+    def may_see(self, x, y):
+        """
+        Test prudent pour le rendu : faux seulement si la case (x, y) est dans la fenêtre
+        et qu'aucune case vue ne la touche. Au-delà du rayon, on ne sait pas : vrai.
+        """
+        if self.center is None or (x - self.center[0]) ** 2 + (y - self.center[1]) ** 2 > self.radius ** 2:
+            return True
+        x -= self.origin[0]
+        y -= self.origin[1]
+        rows, cols = self.nearby.shape
+        if not (0 <= x < cols and 0 <= y < rows):
+            return True
+        return bool(self.nearby[y, x])
@@ -1,18 +1,95 @@
 # world/map.py
 
+import hashlib
 import json
 import os
+import numpy as np
 import pygame
 from objects.foe import Foe
 from objects.friend import Friend
 from objects.item import Item
+from ai.pathfinding import FlowField
 from .sprite_analyzer import find_logo_positions, LOGO_SIZE
+from .visibility import compute_pvs, compute_chunk_visibility, trace_lines_of_sight, cast_ray, cast_rays
+from .fov import FieldOfView
+from .spatial_hash import SpatialHash
+from .distance_field import compute_nearest_floor
+from .map_format import intern_grid, binary_map_path, load_binary_map, MAP_EXTENSION
+from .map_compiler import read_compiled_map, compile_source_path, faces_to_arrays
+from config import CHUNK_SIZE, CACHE_PATH, PVS_MAX_CELLS, LOS_CACHE_SIZE
+
+# À incrémenter si l'algorithme ou le format du PVS change (invalide le cache)
+PVS_VERSION = 2
+
+# Cases voisines du rayon examinées par hitscan : un sprite de demi-largeur
+# jusqu'à une case peut être touché depuis une case que le rayon ne traverse pas
+HITSCAN_MARGIN = 1
+
+# Couleur du corps des bâtiments dans leurs sprites (les logos/portes sont exclus du masque)
+BUILDING_COLOR = (180, 180, 180)
+
+# Masques de collision déjà calculés : (chemin, date de modification) -> (largeur, hauteur, masque)
+_building_mask_cache = {}
+
+
+def _load_building_mask(sprite_path):
+    """
+    Masque de collision d'un sprite de bâtiment : seuls les pixels opaques de la
+    couleur BUILDING_COLOR sont pleins. Calculé en NumPy sur les tableaux de pixels
+    de la surface, puis mis en cache pour les chargements suivants de l'overworld.
+    Retourne (largeur, hauteur, masque), ou (0, 0, None) si l'image est illisible.
+    """
+    try:
+        cache_key = (sprite_path, os.path.getmtime(sprite_path))
+    except OSError:
+        return 0, 0, None
+    cached = _building_mask_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        image = pygame.image.load(sprite_path)
+    except pygame.error:
+        return 0, 0, None
+    if pygame.display.get_surface() is not None:
+        image = image.convert_alpha()  # Sans fenêtre (compilation des cartes), on garde le format du fichier
+    width, height = image.get_size()
+
+    # Tableaux (largeur, hauteur) : équivaut à get_at((x, y)) == BUILDING_COLOR (alpha 255 compris)
+    body = (pygame.surfarray.array3d(image) == BUILDING_COLOR).all(axis=2) & (pygame.surfarray.array_alpha(image) == 255)
+
+    building_only_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.surfarray.pixels_alpha(building_only_surface)[...] = body * np.uint8(255)
+    mask = pygame.mask.from_surface(building_only_surface)
+
+    _building_mask_cache[cache_key] = (width, height, mask)
+    return width, height, mask
 
 class GameMap:
     def __init__(self):
         self.grid = []
         self.wall_textures = {}
         self.floor_textures = {}
+        self.doors_config = {}
+        # Grille de tuiles : chaque valeur de case distincte reçoit un petit ID (palette)
+        self.tile_palette = []  # ID de tuile -> valeur de case d'origine
+        self.tiles = np.zeros((0, 0), dtype=np.int16)
+        self.walkable = np.zeros((0, 0), dtype=bool)  # Case de sol (on peut y marcher)
+        self.opaque = np.zeros((0, 0), dtype=bool)    # Case de mur (dessinée, arrête le rendu et les tirs)
+        self.sight_blocking = np.zeros((0, 0), dtype=bool)  # Case qui n'est pas un sol (bloque les lignes de vue)
+        self.door = np.zeros((0, 0), dtype=bool)      # Porte interactive (doors_config)
+        self.door_cells = []  # Cases (x, y) des portes interactives
+        self.floor_distance = np.zeros((0, 0), dtype=np.int32)  # Distance de chaque case au sol le plus proche
+        self.nearest_floor = np.zeros((0, 0, 2), dtype=np.int32)  # (x, y) de ce sol, (-1, -1) si aucun
+        self.flow_field = FlowField(self)  # Chemins vers le joueur, partagés par les ennemis
+        self.field_of_view = FieldOfView(self)  # Cases vues par le joueur (rendu, ennemis, mini-carte)
+        self.pnj_hash = SpatialHash()   # PNJ du niveau rangés par case (tir, mini-carte)
+        self.item_hash = SpatialHash()  # Items du niveau rangés par case (ramassage)
+        self.los_cache = {}  # (x0, y0, x1, y1) -> ligne de vue, vidé quand la grille change
+        self.los_hits = 0
+        self.los_misses = 0
+        self.width = 0
+        self.height = 0
         self.friend_positions = []
         self.foe_positions = []
         self.item_positions = []
@@ -20,28 +97,372 @@ class GameMap:
         self.transition_points = []
         self.spawn_points = {}
         self.exits = [] # NOUVEL ATTRIBUT
+        self.geometry_stats = {} # Nombre de faces avant/après optimisation, par catégorie
+        self.compiled_geometry = None  # Tampons NumPy de toute la géométrie, voir get_geometry_arrays
+        self.chunk_size = CHUNK_SIZE
+        self.chunks = {} # (cx, cy) -> {"index": i, "bounds": (min_x, min_y, min_z, max_x, max_y, max_z)}
+        self.pvs_cells = None  # PVS par case (bits compressés), voir build_pvs
+        self.pvs_chunks = None # Visibilité case -> chunk (booléens)
         self.current_map_path = None
         
         
-    def load_from_file(self, filepath):
+    @property
+    def grid(self):
+        # Carte binaire : la liste de listes n'est reconstruite qu'à la demande
+        # (génération de la géométrie 3D) ; le jeu lui-même n'utilise que `tiles`
+        if self._grid is None:
+            self._grid = np.array(self.tile_palette, dtype=object)[self.tiles].tolist()
+        return self._grid
+
+    @grid.setter
+    def grid(self, value):
+        self._grid = value
+
+    def load_from_file(self, filepath, use_compiled=True):
+        # Le chemin demandé (.json) reste l'identifiant de la carte (portes, sauvegarde)
         self.current_map_path = filepath
+        self.compiled_geometry = None
+        self.los_cache.clear()
+
+        # Carte compilée à jour (voir compile_maps.py) : toutes les données dérivées sont lues telles quelles
+        if use_compiled and read_compiled_map(self, compile_source_path(filepath)):
+            print(f"Carte compilée chargée : {filepath}")
+            self._build_chunks()
+            return
+
+        binary_path = filepath if filepath.endswith(MAP_EXTENSION) else binary_map_path(filepath)
+        if os.path.exists(binary_path) and (binary_path == filepath or not os.path.exists(filepath)
+                                            or os.path.getmtime(binary_path) >= os.path.getmtime(filepath)):
+            try:
+                self._load_binary(binary_path)
+            except ValueError as e:
+                # Carte convertie par une version précédente : on retombe sur le JSON
+                print(f"{e} → chargement du JSON")
+                self._load_json(filepath)
+        else:
+            self._load_json(filepath)
+
+        self._process_buildings()
+        self._build_chunks()
+
+    def _load_json(self, filepath):
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Carte introuvable : {filepath}")
         with open(filepath, 'r') as file:
             data = json.load(file)
             self.grid = data.get("map", [])
-            self.wall_textures = data.get("wall_textures", {})
-            self.floor_textures = data.get("floor_textures", {})
-            self.friend_positions = data.get("friends", [])
-            self.foe_positions = data.get("foes", [])
-            self.item_positions = data.get("items", [])
-            self.building_positions = data.get("buildings", [])
-            self.spawn_points = data.get("spawn_points", {})
-            
-            # NOUVEAU : Chargement de la config des portes interactives
-            self.doors_config = data.get("doors_config", {}) 
+            self._load_entities(data)
+
+        self.tile_palette, self.tiles = intern_grid(self.grid)
+        self._build_tile_masks()
+
+    def _load_binary(self, filepath):
+        """Carte convertie (voir convert_maps.py) : tuiles projetées en mémoire, sans parsing."""
+        meta, self.tiles = load_binary_map(filepath)
+        self.tile_palette = meta["palette"]
+        self._load_entities(meta)
+        self.grid = None
+        self._build_tile_masks()
+
+    def _load_entities(self, data):
+        self.wall_textures = data.get("wall_textures", {})
+        self.floor_textures = data.get("floor_textures", {})
+        self.friend_positions = data.get("friends", [])
+        self.foe_positions = data.get("foes", [])
+        self.item_positions = data.get("items", [])
+        self.building_positions = data.get("buildings", [])
+        self.spawn_points = data.get("spawn_points", {})
         
-        self._process_buildings()
+        # NOUVEAU : Chargement de la config des portes interactives
+        self.doors_config = data.get("doors_config", {}) 
+
+    def _build_tile_masks(self):
+        """
+        Précalcule, à partir des IDs de tuiles, les masques de collision/visibilité :
+        plus aucun test `cell in floor_textures` dans les boucles du jeu.
+        """
+        self.height, self.width = self.tiles.shape
+
+        # Propriétés par ID, puis indexation de tout le tableau d'un coup
+        walkable = np.array([cell is not None and cell in self.floor_textures for cell in self.tile_palette], dtype=bool)
+        opaque = np.array([cell is not None and cell in self.wall_textures for cell in self.tile_palette], dtype=bool)
+        door = np.array([cell is not None and cell in self.doors_config for cell in self.tile_palette], dtype=bool)
+        self.walkable = walkable[self.tiles]
+        self.opaque = opaque[self.tiles]
+        self.sight_blocking = ~self.walkable
+        self.door = door[self.tiles]
+        self.door_cells = [(int(x), int(y)) for y, x in np.argwhere(self.door)]
+        self.floor_distance, self.nearest_floor = compute_nearest_floor(self.walkable)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_walkable(self, x, y):
+        """Vrai si la case (x, y) est un sol ; hors de la carte, on ne marche pas."""
+        return 0 <= x < self.width and 0 <= y < self.height and bool(self.walkable[y, x])
+
+    def are_walkable(self, xs, ys):
+        """Version vectorisée de is_walkable pour des tableaux de cases."""
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        if not self.walkable.size:
+            return inside
+        return inside & self.walkable[np.where(inside, ys, 0), np.where(inside, xs, 0)]
+
+    def get_cell_value(self, x, y):
+        """Valeur d'origine de la case (clé de wall_textures / doors_config), ou None."""
+        if not self.in_bounds(x, y):
+            return None
+        return self.tile_palette[self.tiles[y, x]]
+
+    def has_line_of_sight(self, x0, y0, x1, y1):
+        """
+        Ligne de vue entre deux cases (tracé de Bresenham) : bloquée par la première
+        case qui n'est pas un sol (mur, mais aussi valeur de case inconnue, voir
+        `sight_blocking`), case d'arrivée exclue. Les cases hors carte ne bloquent pas.
+        Le résultat est gardé en cache par couple de cases (vidé quand la grille change).
+        """
+        key = (x0, y0, x1, y1)
+        visible = self.los_cache.get(key)
+        if visible is not None:
+            self.los_hits += 1
+            return visible
+        self.los_misses += 1
+        visible = self._trace_line_of_sight(x0, y0, x1, y1)
+        self._cache_line_of_sight(key, visible)
+        return visible
+
+    def lines_of_sight(self, from_x, from_y, to_x, to_y):
+        """
+        Version groupée de has_line_of_sight : cases de départ et d'arrivée en tableaux
+        (ou scalaires, diffusés ensemble). Les couples absents du cache sont tracés tous
+        à la fois (voir trace_lines_of_sight). Retourne un tableau de booléens.
+        """
+        coords = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64) for v in (from_x, from_y, to_x, to_y)))
+        from_x, from_y, to_x, to_y = (v.ravel() for v in coords)
+        keys = list(zip(from_x.tolist(), from_y.tolist(), to_x.tolist(), to_y.tolist()))
+        result = np.zeros(len(keys), dtype=bool)
+        missing = []
+        for i, key in enumerate(keys):
+            visible = self.los_cache.get(key)
+            if visible is None:
+                missing.append(i)
+            else:
+                result[i] = visible
+        self.los_hits += len(keys) - len(missing)
+        self.los_misses += len(missing)
+
+        if missing:
+            missing = np.array(missing)
+            traced = trace_lines_of_sight(self.sight_blocking, from_x[missing], from_y[missing], to_x[missing], to_y[missing])
+            result[missing] = traced
+            for i, visible in zip(missing.tolist(), traced.tolist()):
+                self._cache_line_of_sight(keys[i], visible)
+        return result
+
+    def _cache_line_of_sight(self, key, visible):
+        if len(self.los_cache) >= LOS_CACHE_SIZE:
+            self.los_cache.clear()
+        self.los_cache[key] = visible
+
+    def _trace_line_of_sight(self, x0, y0, x1, y1):
+        blocking = self.sight_blocking
+        dx = abs(x1 - x0)
+        dy = abs(y1 - y0)
+        x, y = x0, y0
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx - dy
+        while x != x1 or y != y1:
+            if 0 <= y < self.height and 0 <= x < self.width and blocking[y, x]:
+                return False
+            e2 = 2 * err
+            if e2 > -dy:
+                err -= dy
+                x += sx
+            if e2 < dx:
+                err += dx
+                y += sy
+        return True
+
+    def hitscan(self, x, y, z, dir_x, dir_z, max_distance):
+        """
+        Tir instantané depuis le point (x, y, z) du monde, direction horizontale unitaire
+        (dir_x, dir_z) : un rayon DDA s'arrête au premier mur (au plus max_distance), puis
+        seuls les PNJ rangés dans les cases traversées (et leurs voisines) sont testés contre
+        leur billboard, face à la caméra, de demi-largeur et demi-hauteur PNJ.size.
+        Retourne (pnj, distance) pour le PNJ vivant touché le plus proche, ou None.
+        """
+        # axe Z inversé : la ligne y de la grille correspond à -z
+        cells, wall_distance = cast_ray(self.opaque, x, -z, dir_x, -dir_z, max_distance)
+        examined = set()
+        hit = None
+        for cell_x, cell_y in cells:
+            for ny in range(cell_y - HITSCAN_MARGIN, cell_y + HITSCAN_MARGIN + 1):
+                for nx in range(cell_x - HITSCAN_MARGIN, cell_x + HITSCAN_MARGIN + 1):
+                    if (nx, ny) in examined:
+                        continue
+                    examined.add((nx, ny))
+                    for pnj in self.pnj_hash.query_cell(nx, ny):
+                        if pnj.health <= 0 or abs(pnj.position[1] - y) > pnj.size:
+                            continue
+                        # Le billboard est perpendiculaire au rayon : distance le long du
+                        # rayon jusqu'à son plan, puis écart latéral au centre du sprite
+                        dx, dz = pnj.position[0] - x, pnj.position[2] - z
+                        distance = dx * dir_x + dz * dir_z
+                        if distance <= 0 or distance >= wall_distance or (hit is not None and distance >= hit[1]):
+                            continue
+                        lateral = dx * dir_z - dz * dir_x
+                        if abs(lateral) <= pnj.size:
+                            hit = (pnj, distance)
+        return hit
+
+    def hitscan_batch(self, x, y, z, dir_x, dir_z, max_distance):
+        """
+        Version groupée de hitscan pour R rayons partant du même point (plombs d'un tir) :
+        un seul lancer DDA vectorisé sur la grille, puis un seul test NumPy rayons x PNJ
+        candidats (ceux des cases traversées par au moins un rayon, et de leurs voisines).
+        Retourne (pnjs, index, distances) : les PNJ candidats, pour chaque rayon l'indice
+        du PNJ touché dans `pnjs` (-1 si aucun) et la distance de l'impact (PNJ ou mur).
+        """
+        dir_x = np.asarray(dir_x, dtype=np.float64)
+        dir_z = np.asarray(dir_z, dtype=np.float64)
+        count = len(dir_x)
+        # axe Z inversé : la ligne y de la grille correspond à -z
+        origins = np.tile((x, -z), (count, 1))
+        wall_distance, crossed = cast_rays(self.opaque, origins, np.stack([dir_x, -dir_z], axis=1), max_distance)
+
+        # Cases à examiner : celles traversées, élargies de HITSCAN_MARGIN, sans doublon
+        # (dédoublonnées sous forme d'indices entiers décalés de la marge, tous positifs)
+        offsets = np.arange(-HITSCAN_MARGIN, HITSCAN_MARGIN + 1)
+        stride = self.opaque.shape[1] + 2 * HITSCAN_MARGIN
+        keys = np.unique(
+            (crossed[:, 2, None, None] + offsets[None, :, None] + HITSCAN_MARGIN) * stride
+            + (crossed[:, 1, None, None] + offsets[None, None, :] + HITSCAN_MARGIN)
+        )
+        pnjs = [
+            pnj for key in keys.tolist()
+            for pnj in self.pnj_hash.query_cell(key % stride - HITSCAN_MARGIN, key // stride - HITSCAN_MARGIN)
+            if pnj.health > 0 and abs(pnj.position[1] - y) <= pnj.size
+        ]
+        if not pnjs:
+            return pnjs, np.full(count, -1, dtype=np.int64), wall_distance
+
+        # Billboards perpendiculaires aux rayons : distance le long de chaque rayon et écart latéral
+        dx = np.array([pnj.position[0] for pnj in pnjs]) - x
+        dz = np.array([pnj.position[2] for pnj in pnjs]) - z
+        size = np.array([pnj.size for pnj in pnjs])
+        along = dir_x[:, None] * dx[None, :] + dir_z[:, None] * dz[None, :]
+        lateral = dir_z[:, None] * dx[None, :] - dir_x[:, None] * dz[None, :]
+        hit = (along > 0) & (along < wall_distance[:, None]) & (np.abs(lateral) <= size[None, :])
+        along = np.where(hit, along, np.inf)
+
+        index = along.argmin(axis=1)
+        distances = along[np.arange(count), index]
+        touched = np.isfinite(distances)
+        return pnjs, np.where(touched, index, -1), np.where(touched, distances, wall_distance)
+
+    def nearest_floor_cell(self, x, y):
+        """
+        Case de sol la plus proche de (x, y), ramenée dans la carte si besoin (apparition,
+        téléportation) : simple lecture du champ de distance. None si la carte n'a aucun sol.
+        """
+        if not self.width or not self.height:
+            return None
+        x = min(max(x, 0), self.width - 1)
+        y = min(max(y, 0), self.height - 1)
+        nearest_x, nearest_y = self.nearest_floor[y, x].tolist()
+        if nearest_x < 0:
+            return None
+        return nearest_x, nearest_y
+
+    def find_free_cell(self):
+        """Première case de sol (ordre de lecture), ou None si la carte n'en a pas."""
+        cells = np.argwhere(self.walkable)
+        if len(cells) == 0:
+            return None
+        y, x = cells[0]
+        return int(x), int(y)
+
+    def get_chunk_key(self, x, y):
+        """Clé (cx, cy) du chunk contenant la case (x, y) de la grille."""
+        return (x // self.chunk_size, y // self.chunk_size)
+
+    def _build_chunks(self):
+        """
+        Découpe la grille en chunks de chunk_size x chunk_size cases.
+        La boîte englobante couvre l'emprise au sol du chunk sur toute la hauteur
+        des murs (0..1), en coordonnées monde (z = -y).
+        """
+        self.chunks = {}
+        height, width = self.height, self.width
+        for cy in range(0, height, self.chunk_size):
+            for cx in range(0, width, self.chunk_size):
+                x1 = min(cx + self.chunk_size, width)
+                y1 = min(cy + self.chunk_size, height)
+                self.chunks[self.get_chunk_key(cx, cy)] = {
+                    "index": len(self.chunks),
+                    "bounds": (cx, 0.0, -y1, x1, 1.0, -cy)
+                }
+
+    def build_pvs(self):
+        """
+        Calcule l'ensemble potentiellement visible (PVS) : pour chaque case de sol,
+        les cases et les chunks qu'on peut voir depuis n'importe quel point de la case.
+        Le résultat est mis en cache sur disque (indexé par le contenu de la grille).
+        Sans PVS (carte trop grande, grille vide), tout est considéré visible.
+        """
+        self.pvs_cells = None
+        self.pvs_chunks = None
+        height, width = self.height, self.width
+        if height * width == 0 or height * width > PVS_MAX_CELLS:
+            return
+
+        opaque = self.opaque
+        floor = self.walkable
+
+        digest = hashlib.sha1(f"{PVS_VERSION}:{self.chunk_size}:{opaque.shape}".encode())
+        digest.update(opaque.tobytes())
+        digest.update(floor.tobytes())
+        cache_file = os.path.join(CACHE_PATH, "pvs", f"{digest.hexdigest()}.npz")
+
+        if os.path.exists(cache_file):
+            with np.load(cache_file) as data:
+                self.pvs_cells = data["cells"]
+                self.pvs_chunks = data["chunks"]
+            print(f"PVS chargé depuis le cache : {cache_file}")
+            return
+
+        sources = [(x, y) for y, x in zip(*np.nonzero(floor))]
+        self.pvs_cells = compute_pvs(opaque, sources)
+
+        chunk_of_cell = np.array([self.chunks[self.get_chunk_key(x, y)]["index"] for y in range(height) for x in range(width)])
+        self.pvs_chunks = compute_chunk_visibility(self.pvs_cells, chunk_of_cell, len(self.chunks))
+
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            np.savez_compressed(cache_file, cells=self.pvs_cells, chunks=self.pvs_chunks)
+        except OSError as e:
+            print(f"Impossible d'écrire le cache PVS : {e}")
+        print(f"PVS calculé pour {len(sources)} cases de sol")
+
+    def get_visible_chunks(self, x, y):
+        """Tableau booléen des chunks visibles depuis la case (x, y), ou None si inconnu."""
+        if self.pvs_chunks is None or not self.in_bounds(x, y):
+            return None
+        row = self.pvs_chunks[y * self.width + x]
+        return row if row.any() else None  # Case sans PVS (mur) : pas de culling
+
+    def is_cell_visible(self, from_x, from_y, to_x, to_y):
+        """Vrai si la case (to_x, to_y) peut être vue depuis (from_x, from_y) d'après le PVS."""
+        if self.pvs_cells is None:
+            return True
+        if not (self.in_bounds(from_x, from_y) and self.in_bounds(to_x, to_y)):
+            return True
+        row = self.pvs_cells[from_y * self.width + from_x]
+        if not row.any():
+            return True
+        index = to_y * self.width + to_x
+        return bool(row[index >> 3] & (0x80 >> (index & 7)))
 
     def _process_buildings(self):
         """
@@ -51,37 +472,18 @@ class GameMap:
         self.transition_points = []
         processed_buildings = []
 
-        BUILDING_COLOR = (180, 180, 180)
-
         for building_data in self.building_positions:
             sprite_path = building_data.get("sprite")
             if not sprite_path: continue
 
             full_sprite_path = f"assets/sprites/{sprite_path}"
             
-            try:
-                image = pygame.image.load(full_sprite_path).convert_alpha()
-                width, height = image.get_size()
-            except pygame.error:
-                width, height, image = 0, 0, None
+            # Masque isolant le corps du bâtiment (calcul vectorisé, en cache par sprite)
+            width, height, mask = _load_building_mask(full_sprite_path)
 
             building_data['texture_width'] = width
             building_data['texture_height'] = height
-
-            if image:
-                # Création d'une surface temporaire pour isoler le bâtiment
-                building_only_surface = pygame.Surface((width, height), pygame.SRCALPHA)
-                
-                # On ne copie que les pixels de la couleur du bâtiment
-                for y in range(height):
-                    for x in range(width):
-                        if image.get_at((x, y)) == BUILDING_COLOR:
-                            building_only_surface.set_at((x, y), (255, 255, 255, 255))
-                
-                # Le masque est généré à partir de cette surface épurée
-                building_data['mask'] = pygame.mask.from_surface(building_only_surface)
-            else:
-                building_data['mask'] = None
+            building_data['mask'] = mask
 
             logo_positions = find_logo_positions(full_sprite_path)
             
@@ -103,73 +505,183 @@ class GameMap:
 
         self.building_positions = processed_buildings
 
+    def get_geometry_arrays(self):
+        """
+        Géométrie statique complète (murs, plafonds puis sols) en tampons NumPy
+        (voir faces_to_arrays). Lue telle quelle depuis la carte compilée, sinon
+        générée une fois puis gardée.
+        """
+        if self.compiled_geometry is None:
+            self.compiled_geometry = faces_to_arrays(self.get_wall_geometry() + self.get_floor_geometry())
+        return self.compiled_geometry
+
     def get_wall_geometry(self):
+        """
+        MODIFIÉ: Ne génère plus que les faces de mur visibles.
+        - Une face collée à un autre mur ou au bord de la carte est supprimée.
+        - Les faces coplanaires consécutives de même texture sont fusionnées en un
+          seul quad plus long (les UV dépassent 1 pour que la texture se répète).
+        Les fusions ne franchissent jamais une frontière de chunk : chaque face
+        porte la clé "chunk" de la case où elle commence.
+        """
         geometry = []
-        for y, row in enumerate(self.grid):
-            for x, cell in enumerate(row):
-                if cell in self.wall_textures:
-                    texture = self.wall_textures[cell]
-                    # Face avant
-                    geometry.append({
-                        "vertices": [(x, 0, -y), (x + 1, 0, -y), (x + 1, 1, -y), (x, 1, -y)],
-                        "texture": texture
-                    })
-                    # Face arrière
-                    geometry.append({
-                        "vertices": [(x + 1, 0, -y - 1), (x, 0, -y - 1), (x, 1, -y - 1), (x + 1, 1, -y - 1)],
-                        "texture": texture
-                    })
-                    # Face droite
-                    geometry.append({
-                        "vertices": [(x + 1, 0, -y), (x + 1, 0, -y - 1), (x + 1, 1, -y - 1), (x + 1, 1, -y)],
-                        "texture": texture
-                    })
-                    # Face gauche
-                    geometry.append({
-                        "vertices": [(x, 0, -y - 1), (x, 0, -y), (x, 1, -y), (x, 1, -y - 1)],
-                        "texture": texture
-                    })
-                    # Plafond
-                    geometry.append({
-                        "vertices": [(x, 1, -y), (x + 1, 1, -y), (x + 1, 1, -y - 1), (x, 1, -y - 1)],
-                        "texture": texture
-                    })
+        height = len(self.grid)
+        width = len(self.grid[0]) if self.grid else 0
+
+        # Faces avant (z = -y) et arrière (z = -y - 1) : segments le long de x
+        for y in range(height):
+            front = [self._exposed_wall_texture(x, y, 0, -1) for x in range(width)]
+            for x0, x1, texture in self._merge_runs(front, self.chunk_size):
+                geometry.append({
+                    "vertices": [(x0, 0, -y), (x1, 0, -y), (x1, 1, -y), (x0, 1, -y)],
+                    "uvs": self._quad_uvs(x1 - x0),
+                    "texture": texture,
+                    "chunk": self.get_chunk_key(x0, y)
+                })
+            back = [self._exposed_wall_texture(x, y, 0, 1) for x in range(width)]
+            for x0, x1, texture in self._merge_runs(back, self.chunk_size):
+                geometry.append({
+                    "vertices": [(x1, 0, -y - 1), (x0, 0, -y - 1), (x0, 1, -y - 1), (x1, 1, -y - 1)],
+                    "uvs": self._quad_uvs(x1 - x0),
+                    "texture": texture,
+                    "chunk": self.get_chunk_key(x0, y)
+                })
+
+        # Faces droite (x + 1) et gauche (x) : segments le long de y
+        for x in range(width):
+            right = [self._exposed_wall_texture(x, y, 1, 0) for y in range(height)]
+            for y0, y1, texture in self._merge_runs(right, self.chunk_size):
+                geometry.append({
+                    "vertices": [(x + 1, 0, -y0), (x + 1, 0, -y1), (x + 1, 1, -y1), (x + 1, 1, -y0)],
+                    "uvs": self._quad_uvs(y1 - y0),
+                    "texture": texture,
+                    "chunk": self.get_chunk_key(x, y0)
+                })
+            left = [self._exposed_wall_texture(x, y, -1, 0) for y in range(height)]
+            for y0, y1, texture in self._merge_runs(left, self.chunk_size):
+                geometry.append({
+                    "vertices": [(x, 0, -y1), (x, 0, -y0), (x, 1, -y0), (x, 1, -y1)],
+                    "uvs": self._quad_uvs(y1 - y0),
+                    "texture": texture,
+                    "chunk": self.get_chunk_key(x, y0)
+                })
+
+        # Plafond : rectangles fusionnés au-dessus des blocs de murs
+        ceiling_textures = [[self.wall_textures.get(cell) for cell in row] for row in self.grid]
+        for x0, y0, x1, y1, texture in self._merge_rectangles(ceiling_textures, self.chunk_size):
+            geometry.append({
+                "vertices": self._generate_floor_quad(x0, y0, x1 - x0, y1 - y0, elevation=1),
+                "uvs": self._quad_uvs(x1 - x0, y1 - y0),
+                "texture": texture,
+                "chunk": self.get_chunk_key(x0, y0)
+            })
+
+        wall_cells = int(self.opaque.sum())
+        self.geometry_stats["walls"] = (wall_cells * 5, len(geometry))
         return geometry
 
     def get_floor_geometry(self):
+        """MODIFIÉ: Les cases de sol adjacentes de même texture sont fusionnées en rectangles."""
         geometry = []
-        for y, row in enumerate(self.grid):
-            for x, cell in enumerate(row):
-                if cell in self.floor_textures:
-                    geometry.append({
-                        "vertices": self._generate_floor_quad(x, y),
-                        "texture": self.floor_textures[cell]
-                    })
+        floor_textures = [
+            [self.floor_textures.get(cell) if isinstance(self.floor_textures.get(cell), str) else None for cell in row]
+            for row in self.grid
+        ]
+        for x0, y0, x1, y1, texture in self._merge_rectangles(floor_textures, self.chunk_size):
+            geometry.append({
+                "vertices": self._generate_floor_quad(x0, y0, x1 - x0, y1 - y0),
+                "uvs": self._quad_uvs(x1 - x0, y1 - y0),
+                "texture": texture,
+                "chunk": self.get_chunk_key(x0, y0)
+            })
+
+        floor_cells = sum(1 for row in floor_textures for texture in row if texture is not None)
+        self.geometry_stats["floors"] = (floor_cells, len(geometry))
         return geometry
 
-    def _generate_floor_quad(self, x, y):
+    def _generate_floor_quad(self, x, y, width=1, height=1, elevation=0):
         return [
-            (x, 0, -y),
-            (x + 1, 0, -y),
-            (x + 1, 0, -y - 1),
-            (x, 0, -y - 1)
+            (x, elevation, -y),
+            (x + width, elevation, -y),
+            (x + width, elevation, -y - height),
+            (x, elevation, -y - height)
         ]
 
-    def _find_nearest_valid_position(self, start_x, start_y):
-        from collections import deque
-        visited = set()
-        queue = deque([(start_x, start_y)])
-        while queue:
-            x, y = queue.popleft()
-            if 0 <= y < len(self.grid) and 0 <= x < len(self.grid[0]):
-                if self.grid[y][x] in self.floor_textures:
-                    return x, y
-                for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                    nx, ny = x + dx, y + dy
-                    if (nx, ny) not in visited:
-                        visited.add((nx, ny))
-                        queue.append((nx, ny))
-        return start_x, start_y
+    def _is_wall(self, x, y):
+        """Une case hors de la grille compte comme un mur (le bord de carte n'est jamais vu)."""
+        if self.in_bounds(x, y):
+            return bool(self.opaque[y, x])
+        return True
+
+    def _exposed_wall_texture(self, x, y, dx, dy):
+        """Texture de la face (dx, dy) du mur en (x, y), ou None si la face est cachée."""
+        if not (0 <= y < len(self.grid) and 0 <= x < len(self.grid[y])):
+            return None
+        cell = self.grid[y][x]
+        if cell not in self.wall_textures or self._is_wall(x + dx, y + dy):
+            return None
+        return self.wall_textures[cell]
+
+    @staticmethod
+    def _merge_runs(values, block=None):
+        """
+        Regroupe les valeurs consécutives identiques (hors None) en (début, fin, valeur).
+        Si `block` est donné, un segment est coupé à chaque multiple de `block`.
+        """
+        runs = []
+        start = 0
+        for i in range(1, len(values) + 1):
+            if i == len(values) or values[i] != values[start] or (block and i % block == 0):
+                if values[start] is not None:
+                    runs.append((start, i, values[start]))
+                start = i
+        return runs
+
+    @staticmethod
+    def _merge_rectangles(texture_grid, block=None):
+        """
+        Fusion gloutonne d'une grille de textures (None = vide) en rectangles
+        (x0, y0, x1, y1, texture), bornes hautes exclues.
+        Si `block` est donné, aucun rectangle ne franchit un multiple de `block`.
+        """
+        height = len(texture_grid)
+        done = [[texture is None for texture in row] for row in texture_grid]
+        rectangles = []
+
+        for y in range(height):
+            row = texture_grid[y]
+            for x in range(len(row)):
+                if done[y][x]:
+                    continue
+                texture = row[x]
+
+                # Extension en largeur
+                x1 = x + 1
+                while x1 < len(row) and not (block and x1 % block == 0) and not done[y][x1] and row[x1] == texture:
+                    x1 += 1
+
+                # Extension en hauteur tant que la ligne entière correspond
+                y1 = y + 1
+                while y1 < height and not (block and y1 % block == 0) and all(
+                    x2 < len(texture_grid[y1]) and not done[y1][x2] and texture_grid[y1][x2] == texture
+                    for x2 in range(x, x1)
+                ):
+                    y1 += 1
+
+                for yy in range(y, y1):
+                    for xx in range(x, x1):
+                        done[yy][xx] = True
+                rectangles.append((x, y, x1, y1, texture))
+
+        return rectangles
+
+    @staticmethod
+    def _quad_uvs(width, height=1):
+        return [(0, 0), (width, 0), (width, height), (0, height)]
+
+    def resolve_spawn_cell(self, x, y):
+        """Case de sol où apparaît une entité placée en (x, y) : la case elle-même, ou le sol le plus proche."""
+        return self.nearest_floor_cell(x, y) or (x, y)
 
     def get_initial_pnjs(self, game_session=None):
         pnjs = []
@@ -181,10 +693,7 @@ class GameMap:
             # Génération d'un ID stable basé sur la position et le nom
             pnj_id = f"pnj_{name}_{x}_{y}"
 
-            if self.grid[y][x] not in self.floor_textures:
-                x_cell, y_cell = self._find_nearest_valid_position(x, y)
-            else:
-                x_cell, y_cell = x, y
+            x_cell, y_cell = self.resolve_spawn_cell(x, y)
             
             world_pos = (x_cell + 0.5, 0, -y_cell - 0.5)
             
@@ -209,7 +718,9 @@ class GameMap:
                 new_pnj.size = 0.2
 
             pnjs.append(new_pnj)
-            
+
+        # Index par case, tenu à jour par les déplacements des ennemis
+        self.pnj_hash = SpatialHash(pnjs)
         return pnjs
 
     def get_initial_items(self, game_session=None):
@@ -226,11 +737,7 @@ class GameMap:
                 if game_session and game_session.is_flagged(self.current_map_path, "collected", item_id):
                     continue
 
-                original_x, original_y = pos["x"], pos["y"]
-                if self.grid[original_y][original_x] not in self.floor_textures:
-                    new_x, new_y = self._find_nearest_valid_position(original_x, original_y)
-                else:
-                    new_x, new_y = original_x, original_y
+                new_x, new_y = self.resolve_spawn_cell(pos["x"], pos["y"])
                 
                 world_pos = (new_x + 0.5, 0, -new_y - 0.5)
                 
@@ -242,4 +749,5 @@ class GameMap:
                     ammo_attrs=pos.get("ammo_attrs"),
                     obj_id=item_id
                 ))
+        self.item_hash = SpatialHash(items)
         return items
@@ -0,0 +1,201 @@
+# world/map_compiler.py
+
+import hashlib
+import json
+import os
+import numpy as np
+import pygame
+from config import CACHE_PATH, CHUNK_SIZE
+from .map_format import binary_map_path, MAP_EXTENSION
+
+# À incrémenter si une donnée dérivée ou son calcul change (invalide les cartes compilées)
+COMPILER_VERSION = 2
+COMPILED_MAPS_PATH = os.path.join(CACHE_PATH, "maps")
+
+# Tampons de géométrie stockés (voir faces_to_arrays)
+GEOMETRY_ARRAYS = ("vertices", "uvs", "texture", "chunk")
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def compile_source_path(filepath):
+    """Fichier réellement lu pour une carte : le JSON, ou la carte binaire seule s'il n'y a pas de JSON."""
+    if filepath.endswith(MAP_EXTENSION) or os.path.exists(filepath):
+        return filepath
+    return binary_map_path(filepath)
+
+
+def compiled_map_path(source_path):
+    """
+    Chemin de l'artefact d'une carte, indexé par le contenu de la source et la version
+    du compilateur (None si la source est illisible).
+    """
+    try:
+        digest = _file_digest(source_path)
+    except OSError:
+        return None
+    key = hashlib.sha1(f"{COMPILER_VERSION}:{CHUNK_SIZE}:{digest}".encode()).hexdigest()
+    return os.path.join(COMPILED_MAPS_PATH, f"{key}.npz")
+
+
+def _sprite_path(building):
+    return f"assets/sprites/{building['sprite']}"
+
+
+def _mask_to_array(mask):
+    """Masque pygame -> tableau booléen (largeur, hauteur), même indexation que surfarray."""
+    surface = mask.to_surface(setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 0))
+    return pygame.surfarray.array_alpha(surface) == 255
+
+
+def _array_to_mask(body):
+    surface = pygame.Surface(body.shape, pygame.SRCALPHA)
+    pygame.surfarray.pixels_alpha(surface)[...] = body * np.uint8(255)
+    return pygame.mask.from_surface(surface)
+
+
+def faces_to_arrays(faces):
+    """
+    Liste de faces ({"vertices", "uvs", "texture", "chunk"}) -> tampons NumPy :
+    sommets (N, 4, 3), UV (N, 4, 2), index de texture (N,), chunk (N, 2),
+    et liste des noms de textures ("textures") indexée par "texture".
+    """
+    textures = []
+    index = {}
+    for face in faces:
+        if face["texture"] not in index:
+            index[face["texture"]] = len(textures)
+            textures.append(face["texture"])
+    return {
+        "vertices": np.array([face["vertices"] for face in faces], dtype=np.float32).reshape(-1, 4, 3),
+        "uvs": np.array([face["uvs"] for face in faces], dtype=np.float32).reshape(-1, 4, 2),
+        "texture": np.array([index[face["texture"]] for face in faces], dtype=np.int32),
+        "chunk": np.array([face["chunk"] for face in faces], dtype=np.int32).reshape(-1, 2),
+        "textures": textures,
+    }
+
+
+def write_compiled_map(game_map, source_path, output_path=None):
+    """
+    Calcule toutes les données dérivées d'une carte déjà chargée et les écrit dans
+    un seul fichier .npz : tuiles et masques, tampons de géométrie des murs/sols
+    après élimination des faces cachées, champ de distance au sol le plus proche
+    (placement des entités), masques des bâtiments, positions des portes.
+    Retourne le chemin écrit.
+    """
+    output_path = output_path or compiled_map_path(source_path)
+    arrays = {
+        "tiles": np.asarray(game_map.tiles),
+        "walkable": game_map.walkable,
+        "opaque": game_map.opaque,
+        "door": game_map.door,
+        "door_cells": np.array(game_map.door_cells, dtype=np.int32).reshape(-1, 2),
+        "floor_distance": game_map.floor_distance,
+        "nearest_floor": game_map.nearest_floor,
+    }
+
+    geometry = game_map.get_geometry_arrays()
+    for name in GEOMETRY_ARRAYS:
+        arrays[f"geometry_{name}"] = geometry[name]
+
+    buildings = []
+    dependencies = {}
+    for i, building in enumerate(game_map.building_positions):
+        buildings.append({key: value for key, value in building.items() if key != "mask"})
+        if building.get("mask") is not None:
+            arrays[f"building_mask_{i}"] = _mask_to_array(building["mask"])
+        sprite_path = _sprite_path(building)
+        if os.path.exists(sprite_path):
+            dependencies[sprite_path] = _file_digest(sprite_path)
+
+    meta = {
+        "version": COMPILER_VERSION,
+        "dependencies": dependencies,  # Sprites lus (masques, logos) : l'artefact est périmé s'ils changent
+        "palette": game_map.tile_palette,
+        "wall_textures": game_map.wall_textures,
+        "floor_textures": game_map.floor_textures,
+        "doors_config": game_map.doors_config,
+        "friends": game_map.friend_positions,
+        "foes": game_map.foe_positions,
+        "items": game_map.item_positions,
+        "spawn_points": game_map.spawn_points,
+        "buildings": buildings,
+        "transition_points": game_map.transition_points,
+        "textures": geometry["textures"],
+        "geometry_stats": game_map.geometry_stats,
+    }
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    temp_path = output_path + ".tmp.npz"
+    np.savez(temp_path, **arrays)  # Non compressé : le chargement n'est qu'une lecture
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def read_compiled_map(game_map, source_path):
+    """
+    Remplit `game_map` depuis son artefact compilé s'il existe et est à jour
+    (même source, même version, sprites inchangés). Retourne False sinon.
+    """
+    path = compiled_map_path(source_path)
+    if path is None or not os.path.exists(path):
+        return False
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            if meta.get("version") != COMPILER_VERSION:
+                return False
+            for sprite_path, digest in meta["dependencies"].items():
+                if not os.path.exists(sprite_path) or _file_digest(sprite_path) != digest:
+                    return False
+            # Lecture complète avant de toucher à game_map : un artefact incomplet ne laisse rien à moitié rempli
+            arrays = {name: data[name] for name in data.files}
+        geometry = {name: arrays[f"geometry_{name}"] for name in GEOMETRY_ARRAYS}
+        geometry["textures"] = meta["textures"]
+        buildings = meta["buildings"]
+        for i, building in enumerate(buildings):
+            body = arrays.get(f"building_mask_{i}")
+            building["mask"] = _array_to_mask(body) if body is not None else None
+        tiles = arrays["tiles"]
+        walkable, opaque, door = arrays["walkable"], arrays["opaque"], arrays["door"]
+        door_cells = [tuple(cell) for cell in arrays["door_cells"].tolist()]
+        floor_distance, nearest_floor = arrays["floor_distance"], arrays["nearest_floor"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Carte compilée illisible : {path} → {e}")
+        return False
+
+    game_map._load_entities(meta)
+    game_map.tile_palette = meta["palette"]
+    game_map.tiles = tiles
+    game_map.walkable, game_map.opaque, game_map.door = walkable, opaque, door
+    game_map.sight_blocking = ~walkable
+    game_map.height, game_map.width = tiles.shape
+    game_map.door_cells = door_cells
+    game_map.grid = None
+    game_map.compiled_geometry = geometry
+    game_map.geometry_stats = {kind: tuple(stats) for kind, stats in meta["geometry_stats"].items()}
+    game_map.floor_distance, game_map.nearest_floor = floor_distance, nearest_floor
+    game_map.building_positions = buildings
+    game_map.transition_points = [
+        dict(point, position_on_map=tuple(point["position_on_map"]), anchor_in_sprite=tuple(point["anchor_in_sprite"]))
+        for point in meta["transition_points"]
+    ]
+    return True
+
+
+def compile_map(filepath):
+    """
+    Étape de build : charge une carte source (sans artefact) et écrit sa version
+    compilée. Utilisable dans un processus séparé (aucun appel OpenGL ni fenêtre).
+    Retourne le chemin écrit.
+    """
+    from .map import GameMap  # Import local : map.py importe ce module
+
+    source_path = compile_source_path(filepath)
+    game_map = GameMap()
+    game_map.load_from_file(filepath, use_compiled=False)
+    return write_compiled_map(game_map, source_path)
@@ -0,0 +1,110 @@
+# world/map_format.py
+
+import json
+import os
+import struct
+import numpy as np
+
+# Format binaire des cartes (.dmap) :
+#   en-tête  "<4sIIII" : signature, version, largeur, hauteur, taille des métadonnées
+#   méta     JSON : palette des tuiles, textures murs/sols et table des entités
+#   tuiles   tableau int16 (hauteur x largeur, little-endian) d'IDs de tuiles,
+#            aligné sur MAP_ALIGNMENT octets : projeté tel quel en mémoire par NumPy
+MAP_MAGIC = b"DMAP"
+MAP_VERSION = 1
+MAP_HEADER = struct.Struct("<4sIIII")
+MAP_ALIGNMENT = 16
+MAP_EXTENSION = ".dmap"
+TILE_DTYPE = np.dtype("<i2")
+
+# Clés du JSON d'origine recopiées dans les métadonnées (entités et configuration)
+ENTITY_KEYS = ("friends", "foes", "items", "buildings", "spawn_points", "doors_config")
+
+
+def intern_grid(grid):
+    """
+    Remplace chaque valeur de case par un petit ID entier.
+    Retourne (palette, tuiles) : palette[ID] = valeur d'origine, l'ID 0 (None)
+    servant au bourrage des lignes plus courtes que la plus longue.
+    """
+    height = len(grid)
+    width = max((len(row) for row in grid), default=0)
+    palette = [None]
+    ids = {}
+    tiles = np.zeros((height, width), dtype=TILE_DTYPE)
+    for y, row in enumerate(grid):
+        row_ids = []
+        for cell in row:
+            tile_id = ids.get(cell)
+            if tile_id is None:
+                tile_id = ids[cell] = len(palette)
+                palette.append(cell)
+            row_ids.append(tile_id)
+        tiles[y, :len(row_ids)] = row_ids
+    return palette, tiles
+
+
+def binary_map_path(json_path):
+    """Chemin du fichier binaire correspondant à une carte JSON."""
+    return os.path.splitext(json_path)[0] + MAP_EXTENSION
+
+
+def save_binary_map(data, path):
+    """Écrit une carte (dictionnaire au format JSON habituel) au format binaire."""
+    palette, tiles = intern_grid(data.get("map", []))
+    height, width = tiles.shape
+
+    meta = {
+        "palette": palette,
+        "wall_textures": data.get("wall_textures", {}),
+        "floor_textures": data.get("floor_textures", {}),
+    }
+    for key in ENTITY_KEYS:
+        if key in data:
+            meta[key] = data[key]
+    meta_data = json.dumps(meta).encode("utf-8")
+    tiles_offset = _align(MAP_HEADER.size + len(meta_data))
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAP_HEADER.pack(MAP_MAGIC, MAP_VERSION, width, height, len(meta_data)))
+        f.write(meta_data)
+        f.write(b"\0" * (tiles_offset - f.tell()))
+        f.write(tiles.tobytes())
+    os.replace(temp_path, path)
+
+
+def load_binary_map(path):
+    """
+    Lit l'en-tête et les métadonnées, puis projette le tableau de tuiles en mémoire
+    (np.memmap en lecture seule : rien n'est lu tant que les cases ne sont pas touchées).
+    Retourne (métadonnées, tuiles). Lève ValueError si le fichier n'est pas au bon format.
+    """
+    with open(path, "rb") as f:
+        header = f.read(MAP_HEADER.size)
+        if len(header) < MAP_HEADER.size:
+            raise ValueError(f"Carte binaire tronquée : {path}")
+        magic, version, width, height, meta_size = MAP_HEADER.unpack(header)
+        if magic != MAP_MAGIC or version != MAP_VERSION:
+            raise ValueError(f"Carte binaire d'un autre format (version {version}) : {path}")
+        meta = json.loads(f.read(meta_size).decode("utf-8"))
+
+    tiles_offset = _align(MAP_HEADER.size + meta_size)
+    if width * height == 0:
+        tiles = np.zeros((height, width), dtype=TILE_DTYPE)
+    else:
+        tiles = np.memmap(path, dtype=TILE_DTYPE, mode="r", offset=tiles_offset, shape=(height, width))
+    return meta, tiles
+
+
+def convert_json_map(json_path, output_path=None):
+    """Convertit une carte JSON en carte binaire ; retourne le chemin écrit."""
+    output_path = output_path or binary_map_path(json_path)
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    save_binary_map(data, output_path)
+    return output_path
+
+
+def _align(offset):
+    return (offset + MAP_ALIGNMENT - 1) // MAP_ALIGNMENT * MAP_ALIGNMENT
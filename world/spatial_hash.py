@@ -0,0 +1,102 @@
+# world/spatial_hash.py
+
+import math
+
+
+class SpatialHash:
+    """
+    Hachage spatial sur la grille de la carte : chaque case (x, y) garde la liste des
+    objets (PNJ, items) dont la position tombe dedans. Un objet qui bouge change de
+    case au fil de l'eau (`move`), et les requêtes (case, rectangle, rayon, cône) ne
+    parcourent que les cases concernées : leur coût dépend de la densité locale,
+    pas du nombre d'objets du niveau.
+    """
+    def __init__(self, objects=()):
+        self.buckets = {}  # (x, y) -> objets de la case
+        self.cells = {}    # id(objet) -> case où il est rangé
+        for obj in objects:
+            self.insert(obj)
+
+    def __len__(self):
+        return len(self.cells)
+
+    @staticmethod
+    def cell_of(position):
+        # axe Z inversé : la ligne y de la grille correspond à -z
+        return math.floor(position[0]), math.floor(-position[2])
+
+    def insert(self, obj):
+        cell = self.cell_of(obj.position)
+        self.cells[id(obj)] = cell
+        self.buckets.setdefault(cell, []).append(obj)
+
+    def remove(self, obj):
+        cell = self.cells.pop(id(obj), None)
+        if cell is not None:
+            self._discard(obj, cell)
+
+    def _discard(self, obj, cell):
+        bucket = self.buckets[cell]
+        bucket.remove(obj)
+        if not bucket:
+            del self.buckets[cell]
+
+    def move(self, obj):
+        """À appeler après un déplacement : range l'objet dans sa nouvelle case. Retourne True s'il a changé de case."""
+        cell = self.cell_of(obj.position)
+        previous = self.cells.get(id(obj))
+        if cell == previous:
+            return False
+        if previous is not None:
+            self._discard(obj, previous)
+        self.cells[id(obj)] = cell
+        self.buckets.setdefault(cell, []).append(obj)
+        return True
+
+    def query_cell(self, x, y):
+        """Objets de la case (x, y)."""
+        return list(self.buckets.get((x, y), ()))
+
+    def query_cells(self, x0, y0, x1, y1):
+        """Objets des cases x0 <= x < x1, y0 <= y < y1."""
+        if (x1 - x0) * (y1 - y0) > len(self.buckets):
+            # Rectangle plus grand que le nombre de cases occupées : on parcourt plutôt celles-ci
+            return [
+                obj for (x, y), bucket in self.buckets.items()
+                if x0 <= x < x1 and y0 <= y < y1
+                for obj in bucket
+            ]
+        found = []
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                bucket = self.buckets.get((x, y))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+    def query_radius(self, x, z, radius):
+        """Objets à une distance horizontale au plus `radius` du point (x, z) du monde."""
+        candidates = self.query_cells(
+            math.floor(x - radius), math.floor(-z - radius),
+            math.floor(x + radius) + 1, math.floor(-z + radius) + 1
+        )
+        radius_squared = radius * radius
+        return [
+            obj for obj in candidates
+            if (obj.position[0] - x) ** 2 + (obj.position[2] - z) ** 2 <= radius_squared
+        ]
+
+    def query_cone(self, x, z, rotation_y, angle, max_distance):
+        """
+        Objets à moins de `max_distance` du point (x, z) et dans le cône d'ouverture
+        `angle` (degrés) autour de l'orientation `rotation_y` (convention du joueur).
+        """
+        heading = rotation_y % 360
+        found = []
+        for obj in self.query_radius(x, z, max_distance):
+            dx = obj.position[0] - x
+            dz = obj.position[2] - z
+            angle_to_target = math.degrees(math.atan2(-dx, -dz)) % 360
+            if abs((angle_to_target - heading + 180) % 360 - 180) <= angle / 2:
+                found.append(obj)
+        return found
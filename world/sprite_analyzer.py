@@ -1,6 +1,20 @@
 # world/sprite_analyzer.py
 
+import hashlib
+import json
+import os
+import numpy as np
 import pygame
+from config import CACHE_PATH
+
+LOGO_SIZE = 64
+LOGO_BAR_THICKNESS = 16
+LOGO_BAR_COLOR = (0, 0, 0)            # Noir
+LOGO_BACKGROUND_COLOR = (100, 100, 100)  # Gris foncé
+
+# À incrémenter si le logo ou l'algorithme de détection change (invalide le cache)
+LOGO_DETECTION_VERSION = 1
+LOGO_CACHE_PATH = os.path.join(CACHE_PATH, "logos")
 
 def create_logo_definition(size=64, bar_thickness=16):
     """
@@ -10,56 +24,112 @@ def create_logo_definition(size=64, bar_thickness=16):
     logo_def = []
     half_size = size // 2
     half_bar = bar_thickness // 2
-    
+
     for y in range(size):
         row = []
         for x in range(size):
             # Vérifie si le pixel est dans la barre horizontale ou verticale
             if (half_size - half_bar <= x < half_size + half_bar) or \
                (half_size - half_bar <= y < half_size + half_bar):
-                row.append((0, 0, 0)) # Noir
+                row.append(LOGO_BAR_COLOR)
             else:
-                row.append((100, 100, 100)) # Gris foncé
+                row.append(LOGO_BACKGROUND_COLOR)
         logo_def.append(row)
-        
+
     return logo_def
 
-LOGO_DEFINITION = create_logo_definition()
-LOGO_SIZE = 64
+LOGO_DEFINITION = create_logo_definition(LOGO_SIZE, LOGO_BAR_THICKNESS)
+
+
+def _integral_image(mask):
+    """Image intégrale (H + 1, W + 1) : integral[y, x] = nombre de pixels vrais dans mask[:y, :x]."""
+    integral = np.zeros((mask.shape[0] + 1, mask.shape[1] + 1), dtype=np.int32)
+    integral[1:, 1:] = mask.cumsum(axis=0, dtype=np.int32).cumsum(axis=1, dtype=np.int32)
+    return integral
+
+
+def _window_sums(integral, x, y, width, height, out_shape):
+    """
+    Pour chaque position (py, px) du logo dans l'image, somme du masque sur le
+    rectangle (px + x, py + y, width, height) : quatre lectures de l'image intégrale.
+    """
+    rows, cols = out_shape
+    return (integral[y + height:y + height + rows, x + width:x + width + cols]
+            - integral[y:y + rows, x + width:x + width + cols]
+            - integral[y + height:y + height + rows, x:x + cols]
+            + integral[y:y + rows, x:x + cols])
+
+
+def _match_logo(pixels):
+    """
+    Positions (x, y) où le logo apparaît exactement dans `pixels` (tableau H x W x 3).
+    Le logo est une croix (deux barres) de LOGO_BAR_COLOR sur fond LOGO_BACKGROUND_COLOR :
+    il y a correspondance quand toute la croix est de la couleur des barres et tout
+    le reste du carré de la couleur du fond, ce que l'on vérifie par sommes sur rectangles.
+    """
+    image_height, image_width = pixels.shape[:2]
+    if image_width < LOGO_SIZE or image_height < LOGO_SIZE:
+        return []
+    out_shape = (image_height - LOGO_SIZE + 1, image_width - LOGO_SIZE + 1)
+
+    is_bar = _integral_image((pixels == LOGO_BAR_COLOR).all(axis=2))
+    is_background = _integral_image((pixels == LOGO_BACKGROUND_COLOR).all(axis=2))
+
+    start = LOGO_SIZE // 2 - LOGO_BAR_THICKNESS // 2
+    vertical = (start, 0, LOGO_BAR_THICKNESS, LOGO_SIZE)
+    horizontal = (0, start, LOGO_SIZE, LOGO_BAR_THICKNESS)
+    center = (start, start, LOGO_BAR_THICKNESS, LOGO_BAR_THICKNESS)
+    full = (0, 0, LOGO_SIZE, LOGO_SIZE)
+
+    def cross_sum(integral):
+        return (_window_sums(integral, *vertical, out_shape)
+                + _window_sums(integral, *horizontal, out_shape)
+                - _window_sums(integral, *center, out_shape))
+
+    cross_area = 2 * LOGO_SIZE * LOGO_BAR_THICKNESS - LOGO_BAR_THICKNESS ** 2
+    background_area = LOGO_SIZE * LOGO_SIZE - cross_area
+
+    bars_match = cross_sum(is_bar) == cross_area
+    background_match = _window_sums(is_background, *full, out_shape) - cross_sum(is_background) == background_area
+
+    # Ordre de lecture (ligne par ligne), comme l'ancien balayage
+    return [(int(x), int(y)) for y, x in np.argwhere(bars_match & background_match)]
+
 
 def find_logo_positions(sprite_path):
     """
     Scanne un sprite à la recherche de notre "logo de porte"
     et retourne les coordonnées de ses coins supérieurs gauches.
+    Le résultat est mis en cache sur disque, indexé par le contenu du fichier :
+    seuls les sprites modifiés sont analysés à nouveau.
     """
     try:
-        image = pygame.image.load(sprite_path).convert()
+        with open(sprite_path, "rb") as f:
+            digest = hashlib.sha1(f.read())
+    except OSError as e:
+        print(f"Erreur de chargement d'image pour l'analyse de sprite: {e}")
+        return []
+    digest.update(f":{LOGO_DETECTION_VERSION}:{LOGO_SIZE}:{LOGO_BAR_THICKNESS}".encode())
+    cache_file = os.path.join(LOGO_CACHE_PATH, f"{digest.hexdigest()}.json")
+
+    if os.path.exists(cache_file):
+        with open(cache_file, "r") as f:
+            return [tuple(position) for position in json.load(f)]
+
+    try:
+        image = pygame.image.load(sprite_path)
     except pygame.error as e:
         print(f"Erreur de chargement d'image pour l'analyse de sprite: {e}")
         return []
 
-    image_width, image_height = image.get_size()
-    logo_positions = []
-
-    for y in range(image_height - LOGO_SIZE + 1):
-        for x in range(image_width - LOGO_SIZE + 1):
-            is_match = True
-            
-            for ly in range(LOGO_SIZE):
-                for lx in range(LOGO_SIZE):
-                    if x + lx >= image_width or y + ly >= image_height:
-                        is_match = False
-                        break
-                    
-                    pixel_color = image.get_at((x + lx, y + ly))
-                    
-                    if (pixel_color.r, pixel_color.g, pixel_color.b) != LOGO_DEFINITION[ly][lx]:
-                        is_match = False
-                        break
-                if not is_match:
-                    break
-            
-            if is_match:
-                logo_positions.append((x, y))
+    # surfarray est indexé (x, y) : on transpose en (y, x) pour travailler ligne par ligne
+    logo_positions = _match_logo(pygame.surfarray.array3d(image).transpose(1, 0, 2))
+
+    try:
+        os.makedirs(LOGO_CACHE_PATH, exist_ok=True)
+        with open(cache_file, "w") as f:
+            json.dump(logo_positions, f)
+    except OSError as e:
+        print(f"Impossible d'écrire le cache des logos : {e}")
 
     return logo_positions
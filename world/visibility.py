@@ -0,0 +1,269 @@
+# world/visibility.py
+
+import math
+import numpy as np
+
+
+def cast_ray(opaque, origin_x, origin_y, dir_x, dir_y, max_distance):
+    """
+    Un seul rayon sur la grille (DDA d'Amanatides & Woo), depuis le point (origin_x, origin_y)
+    en coordonnées de grille, direction unitaire (dir_x, dir_y), sur au plus `max_distance`.
+    Retourne (cells, distance) : les cases traversées dans l'ordre, et la distance à laquelle
+    le rayon entre dans la première case opaque ou sort de la grille (max_distance sinon).
+    La case opaque elle-même n'est pas dans `cells`.
+    """
+    height, width = opaque.shape
+    x, y = math.floor(origin_x), math.floor(origin_y)
+    step_x = 1 if dir_x >= 0 else -1
+    step_y = 1 if dir_y >= 0 else -1
+    delta_x = abs(1.0 / dir_x) if dir_x else math.inf
+    delta_y = abs(1.0 / dir_y) if dir_y else math.inf
+    next_x = ((x + 1 - origin_x) if step_x > 0 else (origin_x - x)) * delta_x if dir_x else math.inf
+    next_y = ((y + 1 - origin_y) if step_y > 0 else (origin_y - y)) * delta_y if dir_y else math.inf
+
+    cells = []
+    distance = 0.0  # Distance d'entrée dans la case courante
+    while distance < max_distance:
+        if not (0 <= x < width and 0 <= y < height) or opaque[y, x]:
+            return cells, distance
+        cells.append((x, y))
+        if next_x < next_y:
+            distance = next_x
+            next_x += delta_x
+            x += step_x
+        else:
+            distance = next_y
+            next_y += delta_y
+            y += step_y
+    return cells, max_distance
+
+
+def cast_rays(opaque, origins, directions, max_distance):
+    """
+    Version groupée de cast_ray : les R rayons (origines et directions unitaires (R, 2),
+    en coordonnées de grille) avancent ensemble d'une case par itération.
+    Retourne (distances (R,), cells (K, 3)) : distance d'arrêt de chaque rayon (premier
+    mur, bord de la grille ou max_distance), et les cases traversées en (rayon, x, y).
+    """
+    height, width = opaque.shape
+    count = len(origins)
+    cell_x = np.floor(origins[:, 0]).astype(np.int64)
+    cell_y = np.floor(origins[:, 1]).astype(np.int64)
+    dir_x, dir_y = directions[:, 0], directions[:, 1]
+
+    step_x = np.where(dir_x >= 0, 1, -1)
+    step_y = np.where(dir_y >= 0, 1, -1)
+    with np.errstate(divide="ignore"):
+        delta_x = np.where(dir_x != 0, np.abs(1.0 / dir_x), np.inf)
+        delta_y = np.where(dir_y != 0, np.abs(1.0 / dir_y), np.inf)
+    next_x = np.where(step_x > 0, cell_x + 1 - origins[:, 0], origins[:, 0] - cell_x) * delta_x
+    next_y = np.where(step_y > 0, cell_y + 1 - origins[:, 1], origins[:, 1] - cell_y) * delta_y
+    next_x = np.nan_to_num(next_x, nan=np.inf)
+    next_y = np.nan_to_num(next_y, nan=np.inf)
+
+    # Les tableaux ne gardent que les rayons encore actifs (compactés quand l'un s'arrête)
+    rays = np.arange(count) if max_distance > 0 else np.arange(0)
+    distances = np.zeros(count)  # Distance d'entrée dans la case courante
+    crossed_rays, crossed_x, crossed_y = [], [], []
+    while len(rays):
+        inside = (cell_x >= 0) & (cell_x < width) & (cell_y >= 0) & (cell_y < height)
+        blocked = ~inside
+        blocked[inside] = opaque[cell_y[inside], cell_x[inside]]
+        if blocked.any():
+            # Un rayon arrêté garde sa distance d'entrée dans le mur
+            keep = ~blocked
+            rays, cell_x, cell_y, next_x, next_y = rays[keep], cell_x[keep], cell_y[keep], next_x[keep], next_y[keep]
+            step_x, step_y, delta_x, delta_y = step_x[keep], step_y[keep], delta_x[keep], delta_y[keep]
+        crossed_rays.append(rays)
+        crossed_x.append(cell_x)
+        crossed_y.append(cell_y)
+
+        move_x = next_x < next_y
+        distance = np.where(move_x, next_x, next_y)
+        distances[rays] = distance
+        next_x = np.where(move_x, next_x + delta_x, next_x)
+        next_y = np.where(move_x, next_y, next_y + delta_y)
+        cell_x = np.where(move_x, cell_x + step_x, cell_x)
+        cell_y = np.where(move_x, cell_y, cell_y + step_y)
+
+        reached = distance >= max_distance
+        if reached.any():
+            distances[rays[reached]] = max_distance
+            keep = ~reached
+            rays, cell_x, cell_y, next_x, next_y = rays[keep], cell_x[keep], cell_y[keep], next_x[keep], next_y[keep]
+            step_x, step_y, delta_x, delta_y = step_x[keep], step_y[keep], delta_x[keep], delta_y[keep]
+
+    if not crossed_rays:
+        return distances, np.zeros((0, 3), dtype=np.int64)
+    cells = np.stack([np.concatenate(crossed_rays), np.concatenate(crossed_x), np.concatenate(crossed_y)], axis=1)
+    return distances, cells
+
+
+def trace_lines_of_sight(blocking, from_x, from_y, to_x, to_y):
+    """
+    Lignes de vue case à case (tracé de Bresenham) pour N couples à la fois : toutes
+    les lignes avancent d'un pas par itération, comme GameMap.has_line_of_sight.
+    Une ligne est bloquée par la première case de `blocking` (H, W) rencontrée, case
+    d'arrivée exclue ; les cases hors de la grille ne bloquent pas.
+    Entrées : tableaux d'entiers (N,) ; retourne un tableau booléen (N,).
+    """
+    height, width = blocking.shape
+    x, y = from_x.astype(np.int64), from_y.astype(np.int64)
+    dx, dy = np.abs(to_x - x), np.abs(to_y - y)
+    step_x = np.where(x < to_x, 1, -1)
+    step_y = np.where(y < to_y, 1, -1)
+    err = dx - dy
+
+    visible = np.ones(len(x), dtype=bool)
+    active = (x != to_x) | (y != to_y)
+    while active.any():
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        blocked = active & inside & blocking[np.where(inside, y, 0), np.where(inside, x, 0)]
+        visible &= ~blocked
+        active &= ~blocked
+
+        e2 = 2 * err
+        move_x = active & (e2 > -dy)
+        move_y = active & (e2 < dx)
+        err = err - np.where(move_x, dy, 0) + np.where(move_y, dx, 0)
+        x = x + np.where(move_x, step_x, 0)
+        y = y + np.where(move_y, step_y, 0)
+        active &= (x != to_x) | (y != to_y)
+
+    return visible
+
+
+# Quadrants (sens x, sens y) balayés par le champ de vision permissif
+PVS_QUADRANTS = ((1, 1), (1, -1), (-1, -1), (-1, 1))
+
+
+def _relative_side(line, x, y):
+    """Position du point (x, y) par rapport à la ligne (xi, yi, xf, yf) : > 0 d'un côté, < 0 de l'autre, 0 dessus."""
+    xi, yi, xf, yf = line
+    return (yf - yi) * (xf - x) - (xf - xi) * (yf - y)
+
+
+def _check_view(views, index):
+    """Supprime la vue `index` si ses deux bords sont confondus et partent d'un coin de la case source."""
+    shallow, steep = views[index][0], views[index][1]
+    if (_relative_side(shallow, steep[0], steep[1]) == 0 and _relative_side(shallow, steep[2], steep[3]) == 0
+            and (_relative_side(shallow, 0, 1) == 0 or _relative_side(shallow, 1, 0) == 0)):
+        del views[index]
+        return False
+    return True
+
+
+def _add_shallow_bump(view, x, y):
+    """Resserre le bord bas de la vue sur le coin (x, y) d'un mur, en contournant les bosses du bord haut."""
+    shallow = view[0]
+    shallow[2], shallow[3] = x, y
+    view[2] = (x, y, view[2])
+    bump = view[3]
+    while bump is not None:
+        if _relative_side(shallow, bump[0], bump[1]) < 0:
+            shallow[0], shallow[1] = bump[0], bump[1]
+        bump = bump[2]
+
+
+def _add_steep_bump(view, x, y):
+    """Resserre le bord haut de la vue sur le coin (x, y) d'un mur, en contournant les bosses du bord bas."""
+    steep = view[1]
+    steep[2], steep[3] = x, y
+    view[3] = (x, y, view[3])
+    bump = view[2]
+    while bump is not None:
+        if _relative_side(steep, bump[0], bump[1]) > 0:
+            steep[0], steep[1] = bump[0], bump[1]
+        bump = bump[2]
+
+
+def _permissive_quadrant(blocked, lit, width, origin_x, origin_y, sign_x, sign_y, extent_x, extent_y):
+    """
+    Un quadrant du champ de vision permissif, dans un repère local où la case source
+    occupe [0, 1] x [0, 1]. Les cases sont parcourues par diagonales successives ;
+    chaque vue est un faisceau de droites délimité par deux bords (lignes entre un point
+    de la case source et un coin de mur) et par les coins de murs qui les ont resserrés
+    (bosses). Un mur qui coupe une vue la resserre ou la scinde en deux.
+    """
+    # Vue : [bord bas, bord haut, bosses du bord bas, bosses du bord haut] (bosses en liste chaînée)
+    views = [[[0, 1, extent_x, 0], [1, 0, 0, extent_y], None, None]]
+    for i in range(1, extent_x + extent_y + 1):
+        if not views:
+            break
+        index = 0
+        for j in range(max(0, i - extent_x), min(i, extent_y) + 1):
+            x, y = i - j, j
+            # Coins haut-gauche (x, y + 1) et bas-droit (x + 1, y) de la case
+            while index < len(views) and _relative_side(views[index][1], x + 1, y) >= 0:
+                index += 1
+            if index == len(views):
+                break
+            view = views[index]
+            if _relative_side(view[0], x, y + 1) <= 0:
+                continue
+
+            cell = (origin_y + y * sign_y) * width + origin_x + x * sign_x
+            lit[cell] = 1
+            if not blocked[cell]:
+                continue
+
+            above_shallow = _relative_side(view[0], x + 1, y) < 0
+            below_steep = _relative_side(view[1], x, y + 1) > 0
+            if above_shallow and below_steep:
+                del views[index]  # Le mur bouche toute la vue
+            elif above_shallow:
+                _add_shallow_bump(view, x, y + 1)
+                _check_view(views, index)
+            elif below_steep:
+                _add_steep_bump(view, x + 1, y)
+                _check_view(views, index)
+            else:
+                # Le mur est au milieu de la vue : on la scinde de part et d'autre
+                lower = [list(view[0]), list(view[1]), view[2], view[3]]
+                views.insert(index, lower)
+                _add_steep_bump(lower, x + 1, y)
+                if _check_view(views, index):
+                    index += 1
+                _add_shallow_bump(views[index], x, y + 1)
+                _check_view(views, index)
+
+
+def compute_pvs(opaque, sources):
+    """
+    Calcule l'ensemble potentiellement visible (PVS) de chaque case source, par champ
+    de vision permissif (Precise Permissive FOV) : une case est visible s'il existe un
+    segment non bloqué entre un point quelconque de la case source et un point de la
+    case cible. Le calcul est exact pour toute position de la caméra dans la case,
+    là où un éventail de rayons peut laisser passer des cases entre deux rayons.
+    Retourne un tableau uint8 (H * W, ceil(H * W / 8)) : la ligne y * W + x
+    contient, compressés bit à bit, les cases visibles depuis (x, y)
+    (lignes nulles pour les cases non sources).
+    """
+    height, width = opaque.shape
+    cell_count = height * width
+    pvs = np.zeros((cell_count, (cell_count + 7) // 8), dtype=np.uint8)
+    blocked = opaque.ravel().tolist()
+
+    for x, y in sources:
+        lit = bytearray(cell_count)
+        lit[y * width + x] = 1
+        for sign_x, sign_y in PVS_QUADRANTS:
+            extent_x = width - 1 - x if sign_x > 0 else x
+            extent_y = height - 1 - y if sign_y > 0 else y
+            _permissive_quadrant(blocked, lit, width, x, y, sign_x, sign_y, extent_x, extent_y)
+        pvs[y * width + x] = np.packbits(np.frombuffer(lit, dtype=bool))
+    return pvs
+
+
+def compute_chunk_visibility(pvs, chunk_of_cell, chunk_count):
+    """
+    Déduit du PVS par case la visibilité par chunk : tableau booléen
+    (H * W, chunk_count), un chunk est visible dès qu'une de ses cases l'est.
+    `chunk_of_cell` donne l'index de chunk de chaque case (tableau de taille H * W).
+    """
+    cell_count = len(chunk_of_cell)
+    chunks = np.zeros((len(pvs), chunk_count), dtype=bool)
+    for index in np.flatnonzero(pvs.any(axis=1)):
+        visible = np.unpackbits(pvs[index])[:cell_count].astype(bool)
+        chunks[index, np.unique(chunk_of_cell[visible])] = True
+    return chunks